@@ -1,25 +1,22 @@
 from strands import Agent
 from strands.models.bedrock import BedrockModel
+from concurrent.futures import ThreadPoolExecutor
+import json
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from tools.financial_analyzer import analyze_company_finances
-from tools.news_analyzer import analyze_company_news
+from agents.model_router import PRIMARY_MODEL_ID, ModelRouter
+from tools.financial_analyzer import analyze_company_finances, get_company_finances
+from tools.news_analyzer import analyze_company_news, get_company_news
+from tools.payload import compact_tool_result, estimate_tokens, token_report
+from tools.prefetch import holding_prefetched, store_prefetched
 
-ANALYST_PROMPT = """You are a financial intelligence analyst providing real-time company analysis for investors, analysts, and financial professionals.
-
-When asked about a company:
-1. Call analyze_company_finances with the ticker symbol to get financial data
-2. Call analyze_company_news with the company name and ticker symbol to get market sentiment and news
-3. Check the 'status' field in each tool response:
-   - 'complete': All data sources worked perfectly
-   - 'partial': Some APIs failed, but still provide analysis with available data
-   - 'failed': Tool completely failed, explain what data is missing
-4. Synthesize financial health, market sentiment, and news signals into a professional investment intelligence report
-5. Provide data-driven assessment with clear reasoning
+# "single_turn": prefetch both tools in parallel and make one model call
+# "agent": let the model drive the tool calls itself (one round-trip per tool)
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "single_turn")
 
-Format your analysis EXACTLY as follows:
+REPORT_FORMAT = """Format your analysis EXACTLY as follows:
 
 Overall Assessment: [X/10]
 
@@ -56,10 +53,86 @@ IMPORTANT:
 Be transparent about data quality while providing maximum value with available information.
 """
 
-model = BedrockModel(model_id="arn:aws:bedrock:us-east-1:975050287073:inference-profile/us.anthropic.claude-3-5-haiku-20241022-v1:0", region_name="us-east-1")
+ANALYST_PROMPT = """You are a financial intelligence analyst providing real-time company analysis for investors, analysts, and financial professionals.
+
+When asked about a company:
+1. Call analyze_company_finances with the ticker symbol to get financial data
+2. Call analyze_company_news with the company name and ticker symbol to get market sentiment and news
+3. Check the 'status' field in each tool response:
+   - 'complete': All data sources worked perfectly
+   - 'partial': Some APIs failed, but still provide analysis with available data
+   - 'failed': Tool completely failed, explain what data is missing
+4. Synthesize financial health, market sentiment, and news signals into a professional investment intelligence report
+5. Provide data-driven assessment with clear reasoning
+
+""" + REPORT_FORMAT
+
+SINGLE_TURN_PROMPT = """You are a financial intelligence analyst providing real-time company analysis for investors, analysts, and financial professionals.
+
+You will be given a company along with the results of two data tools:
+1. FINANCIAL DATA from analyze_company_finances (Yahoo Finance + FRED)
+2. NEWS DATA from analyze_company_news (AlphaVantage sentiment + NewsAPI headlines)
+
+When asked about a company:
+1. Check the 'status' field in each tool result:
+   - 'complete': All data sources worked perfectly
+   - 'partial': Some APIs failed, but still provide analysis with available data
+   - 'failed': Tool completely failed, explain what data is missing
+2. Synthesize financial health, market sentiment, and news signals into a professional investment intelligence report
+3. Provide data-driven assessment with clear reasoning
+
+""" + REPORT_FORMAT
+
+
+# primary model plus hedged fallbacks, see MODEL_ROUTES
+router = ModelRouter.from_config()
+
+model = BedrockModel(model_id=PRIMARY_MODEL_ID, region_name="us-east-1")
 
 company_agent = Agent(
     model=model, 
     system_prompt=ANALYST_PROMPT, 
     tools=[analyze_company_finances, analyze_company_news]
-)
\ No newline at end of file
+)
+
+
+def prefetch_tool_outputs(company, ticker):
+    """Run both data tools in parallel ahead of the model"""
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        finances_future = pool.submit(get_company_finances, ticker)
+        news_future = pool.submit(get_company_news, company, ticker)
+        finances = finances_future.result()
+        news = news_future.result()
+    return finances, news
+
+
+def run_analysis(company, ticker, finances=None, news=None, mode=None):
+    """Generate the report for a company - single model call by default, agent-driven tool use on request"""
+    mode = mode or ANALYSIS_MODE
+    if finances is None or news is None:
+        finances, news = prefetch_tool_outputs(company, ticker)
+
+    prompt = f"Analyze {company} ({ticker}) for job seekers"
+
+    if mode == "agent":
+        # the agent's own tool calls pick these up instead of hitting the APIs again
+        store_prefetched("finances", ticker, finances)
+        store_prefetched("news", ticker, news)
+        token_report.record("prompt", estimate_tokens(prompt))
+        with holding_prefetched(ticker):
+            return router.invoke(
+                ANALYST_PROMPT, prompt, tools=[analyze_company_finances, analyze_company_news]
+            )
+
+    # tool results go straight into the one and only model call
+    token_report.record("prompt", estimate_tokens(prompt))
+    prompt += (
+        "\n\nFINANCIAL DATA:\n"
+        + json.dumps(compact_tool_result("finances", finances, drop_keys=("ticker",)), default=str)
+        + "\n\nNEWS DATA:\n"
+        + json.dumps(
+            compact_tool_result("news", news, drop_keys=("company", "ticker", "url")),
+            default=str,
+        )
+    )
+    return router.invoke(SINGLE_TURN_PROMPT, prompt)
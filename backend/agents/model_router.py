@@ -0,0 +1,314 @@
+from strands import Agent
+from strands.models.bedrock import BedrockModel
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
+import bisect
+import boto3
+import contextvars
+import os
+import threading
+import time
+
+PRIMARY_MODEL_ID = "arn:aws:bedrock:us-east-1:975050287073:inference-profile/us.anthropic.claude-3-5-haiku-20241022-v1:0"
+
+# comma-separated model_id@region list, primary first then fallbacks in order
+# ("stub" is an offline model for local load tests)
+MODEL_ROUTES = os.getenv(
+    "MODEL_ROUTES",
+    f"{PRIMARY_MODEL_ID}@us-east-1,us.anthropic.claude-3-5-haiku-20241022-v1:0@us-west-2",
+)
+
+# launch the next model once the current one is slower than this percentile of its history
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+
+# hedge delay used until a model has enough samples for a percentile
+HEDGE_DELAY_SECONDS = float(os.getenv("HEDGE_DELAY_SECONDS", "45"))
+MIN_HEDGE_DELAY_SECONDS = float(os.getenv("MIN_HEDGE_DELAY_SECONDS", "2"))
+MIN_HEDGE_SAMPLES = int(os.getenv("MIN_HEDGE_SAMPLES", "20"))
+
+# optional DynamoDB table (partition key "route") pooling latency samples across instances,
+# so a cold start hedges on the fleet's percentile instead of HEDGE_DELAY_SECONDS
+MODEL_LATENCY_TABLE_NAME = os.getenv("MODEL_LATENCY_TABLE_NAME")
+LATENCY_SYNC_SECONDS = 60
+LATENCY_WINDOW_DAYS = 2
+
+# simulated model latency for the "stub" route
+STUB_LATENCY_SECONDS = float(os.getenv("STUB_LATENCY_SECONDS", "0"))
+
+# concurrent analyses per process: the self-hosted server's --threads (SERVER_THREADS, read
+# when the first call is made so server.py can set it after import), else 1 per Lambda
+# instance plus headroom for losing hedges still finishing in the background
+DEFAULT_ROUTER_CONCURRENCY = 4
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (seconds) for one model"""
+
+    BUCKETS = (0.5, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144, 233)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+        self.total = 0
+        self.errors = 0
+
+    def record(self, seconds):
+        """Count a sample, returning its bucket index"""
+        index = bisect.bisect_left(self.BUCKETS, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.total += 1
+        return index
+
+    def replace_counts(self, counts):
+        """Take the pooled counts from the shared store (they include this instance's samples)"""
+        with self._lock:
+            self.counts = list(counts)
+            self.total = sum(counts)
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def percentile(self, pct):
+        """Upper bound of the bucket holding the pct-th percentile, or None with no samples"""
+        with self._lock:
+            if not self.total:
+                return None
+            target = self.total * pct / 100
+            seen = 0
+            for i, count in enumerate(self.counts):
+                seen += count
+                if seen >= target:
+                    return self.BUCKETS[i] if i < len(self.BUCKETS) else float("inf")
+        return float("inf")
+
+    def summary(self):
+        # the overflow bucket reads ">233" - JSON has no Infinity
+        def bound(pct):
+            value = self.percentile(pct)
+            return f">{self.BUCKETS[-1]}" if value == float("inf") else value
+
+        return {
+            "count": self.total,
+            "errors": self.errors,
+            "p50": bound(50),
+            "p95": bound(95),
+        }
+
+
+class DynamoDBLatencyStore:
+    """Pools histogram bucket counts per route and UTC day in a small DynamoDB table"""
+
+    def __init__(self, table_name):
+        self.table = boto3.resource("dynamodb").Table(table_name)
+
+    def add(self, name, index):
+        now = datetime.now(timezone.utc)
+        self.table.update_item(
+            Key={"route": f"{name}#{now.date().isoformat()}"},
+            UpdateExpression="ADD #bucket :one SET expires_at = :expires_at",
+            ExpressionAttributeNames={"#bucket": f"b{index}"},
+            ExpressionAttributeValues={
+                ":one": 1,
+                ":expires_at": int((now + timedelta(days=LATENCY_WINDOW_DAYS + 1)).timestamp()),
+            },
+        )
+
+    def load(self, name):
+        """Bucket counts over the last LATENCY_WINDOW_DAYS days"""
+        today = datetime.now(timezone.utc).date()
+        counts = [0] * (len(LatencyHistogram.BUCKETS) + 1)
+        for days_ago in range(LATENCY_WINDOW_DAYS):
+            day = (today - timedelta(days=days_ago)).isoformat()
+            item = self.table.get_item(Key={"route": f"{name}#{day}"}).get("Item") or {}
+            for i in range(len(counts)):
+                counts[i] += int(item.get(f"b{i}", 0))
+        return counts
+
+
+class BedrockModelBackend:
+    """One Bedrock model/region - each call gets a fresh Strands agent"""
+
+    def __init__(self, model_id, region_name):
+        self.name = f"{model_id}@{region_name}"
+        self.model = BedrockModel(model_id=model_id, region_name=region_name)
+
+    def invoke(self, system_prompt, prompt, tools=()):
+        agent = Agent(model=self.model, system_prompt=system_prompt, tools=list(tools))
+        return agent(prompt)
+
+
+class StubModelBackend:
+    """Offline stand-in for a model: fixed response, optional delay or error"""
+
+    def __init__(self, name, response="Overall Assessment: 7/10", latency=0.0, error=None):
+        self.name = name
+        self.response = response
+        self.latency = latency
+        self.error = error
+        self.calls = 0
+
+    def invoke(self, system_prompt, prompt, tools=()):
+        self.calls += 1
+        time.sleep(self.latency)
+        if self.error:
+            raise self.error
+        return self.response
+
+
+class ModelRouter:
+    """Calls the primary model and hedges to the next route when it's slow or failing"""
+
+    def __init__(
+        self,
+        backends,
+        hedge_percentile=HEDGE_PERCENTILE,
+        default_hedge_delay=HEDGE_DELAY_SECONDS,
+        min_hedge_delay=MIN_HEDGE_DELAY_SECONDS,
+        min_samples=MIN_HEDGE_SAMPLES,
+        max_workers=None,
+        store=None,
+    ):
+        if not backends:
+            raise ValueError("ModelRouter needs at least one backend")
+        self.backends = list(backends)
+        self.hedge_percentile = hedge_percentile
+        self.default_hedge_delay = default_hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.min_samples = min_samples
+        self.histograms = {b.name: LatencyHistogram() for b in self.backends}
+
+        self.store = store
+        self._synced_at = None
+        self._sync_lock = threading.Lock()
+
+        self.max_workers = max_workers
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, routes=MODEL_ROUTES):
+        """Build Bedrock backends from a 'model_id@region,...' string"""
+        backends = []
+        for route in routes.split(","):
+            if route.strip() == "stub":
+                backends.append(StubModelBackend("stub", latency=STUB_LATENCY_SECONDS))
+                continue
+            model_id, _, region = route.strip().rpartition("@")
+            backends.append(BedrockModelBackend(model_id, region))
+        return cls(backends, store=_latency_store)
+
+    def pool(self):
+        """Shared so a losing hedge can finish in the background without blocking the caller.
+        Sized so every request can have all routes in flight - a smaller pool queues calls,
+        and time spent queued counts against the hedge delay (spurious hedges)."""
+        with self._pool_lock:
+            if self._pool is None:
+                concurrency = int(os.getenv("SERVER_THREADS", DEFAULT_ROUTER_CONCURRENCY))
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers or concurrency * len(self.backends),
+                    thread_name_prefix="model-router",
+                )
+            return self._pool
+
+    def hedge_delay(self, backend):
+        """How long to wait on this backend before launching the next one"""
+        histogram = self.histograms[backend.name]
+        if histogram.total < self.min_samples:
+            return self.default_hedge_delay
+        delay = histogram.percentile(self.hedge_percentile)
+        if delay == float("inf"):
+            return self.default_hedge_delay
+        return max(self.min_hedge_delay, delay)
+
+    def invoke(self, system_prompt, prompt, tools=()):
+        """Return the first successful response across the hedged backends"""
+        self._sync_latencies()
+        pending = {}
+        next_index = 0
+        last_error = None
+
+        def launch():
+            nonlocal next_index
+            backend = self.backends[next_index]
+            next_index += 1
+            # run in the request's context so tool calls record into its token report
+            context = contextvars.copy_context()
+            future = self.pool().submit(
+                context.run, self._timed_invoke, backend, system_prompt, prompt, tools
+            )
+            pending[future] = backend
+            return backend
+
+        current = launch()
+        while pending:
+            has_next = next_index < len(self.backends)
+            timeout = self.hedge_delay(current) if has_next else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if not done:
+                print(f"[router] {current.name} slower than {timeout:.1f}s - hedging")
+                current = launch()
+                continue
+
+            for future in done:
+                backend = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"[router] {backend.name} failed: {e}")
+                    last_error = e
+                    continue
+                print(f"[router] answered by {backend.name}")
+                return result
+
+            # everything that finished failed - fail over right away
+            if next_index < len(self.backends):
+                current = launch()
+
+        raise last_error
+
+    def _timed_invoke(self, backend, system_prompt, prompt, tools):
+        start = time.monotonic()
+        try:
+            result = backend.invoke(system_prompt, prompt, tools)
+        except Exception:
+            self.histograms[backend.name].record_error()
+            raise
+        index = self.histograms[backend.name].record(time.monotonic() - start)
+        if self.store:
+            try:
+                self.store.add(backend.name, index)
+            except Exception as e:
+                print(f"[router] failed to share {backend.name} latency: {e}")
+        return result
+
+    def _sync_latencies(self):
+        """Refresh histograms from the shared store - right away after a cold start, then
+        every LATENCY_SYNC_SECONDS"""
+        if not self.store:
+            return
+        with self._sync_lock:
+            now = time.monotonic()
+            if self._synced_at is not None and now - self._synced_at < LATENCY_SYNC_SECONDS:
+                return
+            self._synced_at = now
+            for name, histogram in self.histograms.items():
+                try:
+                    histogram.replace_counts(self.store.load(name))
+                except Exception as e:
+                    print(f"[router] failed to load shared {name} latencies: {e}")
+
+    def stats(self):
+        """Latency histogram summary and current hedge delay per route, for monitoring"""
+        return {
+            backend.name: {
+                **self.histograms[backend.name].summary(),
+                "hedge_delay": self.hedge_delay(backend),
+            }
+            for backend in self.backends
+        }
+
+
+_latency_store = DynamoDBLatencyStore(MODEL_LATENCY_TABLE_NAME) if MODEL_LATENCY_TABLE_NAME else None
@@ -0,0 +1,90 @@
+import os
+from datetime import date, datetime, timezone
+import yfinance as yf
+from tools.circuit_breaker import get_breaker
+
+# price move vs. the report's stock_performance baseline that makes a report stale
+PRICE_MOVE_THRESHOLD_PCT = float(os.environ.get("PRICE_MOVE_THRESHOLD_PCT", "5"))
+
+# "invalidate": mark stale, regenerate on next request / "refresh": regenerate now
+CHANGE_DETECTION_ACTION = os.environ.get("CHANGE_DETECTION_ACTION", "invalidate")
+
+# how often each ticker's earnings calendar is re-fetched
+EARNINGS_REFRESH_HOURS = float(os.environ.get("EARNINGS_REFRESH_HOURS", "24"))
+
+YAHOO_BREAKER = get_breaker("yahoo")
+
+
+def fetch_bulk_quotes(tickers):
+    """Latest close for many tickers in one Yahoo download"""
+    if not tickers:
+        return {}
+
+    data = YAHOO_BREAKER.call(
+        yf.download,
+        tickers,
+        period="5d",
+        group_by="ticker",
+        progress=False,
+        threads=True,
+    )
+
+    # group_by="ticker" keys columns (ticker, field) even for a single ticker
+    quotes = {}
+    for ticker in tickers:
+        try:
+            closes = data[ticker]["Close"].dropna()
+            if len(closes):
+                quotes[ticker] = float(closes.iloc[-1])
+        except (KeyError, IndexError):
+            continue
+    return quotes
+
+
+def fetch_earnings_dates(ticker):
+    """Upcoming/recent earnings dates as ISO date strings"""
+    calendar = YAHOO_BREAKER.call(lambda: yf.Ticker(ticker).calendar) or {}
+    dates = calendar.get("Earnings Date", []) if isinstance(calendar, dict) else []
+    if not isinstance(dates, (list, tuple)):
+        dates = [dates]
+    return sorted(d.isoformat() if isinstance(d, (date, datetime)) else str(d)[:10] for d in dates)
+
+
+def earnings_due(item, now):
+    """True if the item's earnings dates are missing or older than EARNINGS_REFRESH_HOURS"""
+    checked_at = item.get("earnings_checked_at")
+    if not checked_at:
+        return True
+    age_hours = (now - datetime.fromisoformat(checked_at)).total_seconds() / 3600
+    return age_hours >= EARNINGS_REFRESH_HOURS
+
+
+def price_baseline(item):
+    """The stock_performance price the report was written against, or None (older items, failed fetches)"""
+    baseline = (item.get("metrics") or {}).get("current_price")
+    return float(baseline) if baseline else None
+
+
+def change_reason(item, price, now):
+    """Why a cached report no longer reflects its inputs, or None if it still does"""
+    report_date = datetime.fromisoformat(item["timestamp"]).date().isoformat()
+    today = now.date().isoformat()
+
+    for earnings_date in item.get("earnings_dates") or []:
+        # earnings reported after the report was written (a same-day report counts once the day is over)
+        if report_date <= earnings_date <= today and (
+            earnings_date > report_date or earnings_date < today
+        ):
+            return f"earnings on {earnings_date}"
+
+    baseline = price_baseline(item)
+    if price is not None and baseline:
+        move_pct = (price - baseline) / baseline * 100
+        if abs(move_pct) >= PRICE_MOVE_THRESHOLD_PCT:
+            return f"price moved {move_pct:+.1f}%"
+
+    return None
+
+
+def utc_now():
+    return datetime.now(timezone.utc)
@@ -1,33 +1,72 @@
 import json
 import re
 import traceback
-import boto3
 import os
 import time
 import random
 from datetime import datetime, timezone, timedelta
 from decimal import Decimal
-from agents.company_analyst import company_agent
+from profiling import profiled
+from report_cache import ReportCache, make_etag
+from storage import CACHE_BACKEND, condition_failed, open_table
+from change_detector import (
+    CHANGE_DETECTION_ACTION,
+    change_reason,
+    earnings_due,
+    fetch_bulk_quotes,
+    fetch_earnings_dates,
+    price_baseline,
+    utc_now,
+)
+from score_history import (
+    history_enabled,
+    parse_history_bound,
+    query_history,
+    record_history,
+    summarize_changes,
+)
+from symbol_index import get_symbol_index, resolve_symbol
+from agents.company_analyst import prefetch_tool_outputs, router, run_analysis
+from tools.circuit_breaker import breaker_status
+from tools.fingerprint import fingerprint_tool_outputs
+from tools.payload import token_report
 
 # Lambda memory cache (persists across invocations)
 DASHBOARD_CACHE = None
+DASHBOARD_VERSION = None
 CACHE_TIMESTAMP = None
 CACHE_DURATION_SECONDS = 300  # 5 minutes
 
+# Browser/CDN caching for read endpoints
+# reports are read right after /analyze rewrites them, so always revalidate (a cheap 304)
+REPORT_CACHE_CONTROL = "no-cache"
+DASHBOARD_CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=300"
+SEARCH_CACHE_CONTROL = "public, max-age=3600"
+
 TABLE_NAME = os.environ.get("COMPANY_CACHE_TABLE_NAME")
 
-if not TABLE_NAME:
+if not TABLE_NAME and CACHE_BACKEND == "dynamodb":
     raise EnvironmentError(
         "COMPANY_CACHE_TABLE_NAME environment variable not set. Cannot initialize DynamoDB."
     )
 
-# DynamoDB setup
-dynamodb = boto3.resource("dynamodb")
-cache_table = dynamodb.Table(TABLE_NAME)
+# DynamoDB setup (or a local stand-in when self-hosted, see CACHE_BACKEND)
+cache_table = open_table(TABLE_NAME or "company_cache", "ticker")
 
 CACHE_DURATION_HOURS = 24
 
+# cached answers are held back ~this long (±20%) so they feel like a fresh analysis in the UI -
+# 0 for the self-hosted server, where it would just tie up handler threads
+CACHED_RESPONSE_DELAY_SECONDS = float(os.environ.get("CACHED_RESPONSE_DELAY_SECONDS", "12.5"))
+
+# change detection can keep a quiet ticker's report fresh past CACHE_DURATION_HOURS, up to this
+MAX_REPORT_AGE_HOURS = float(os.environ.get("MAX_REPORT_AGE_HOURS", "168"))
+
+# Decoded, pre-serialized reports for this Lambda instance
+report_cache = ReportCache()
+
 
+@profiled
 def lambda_handler(event, context):
     """Main Lambda handler - routes to appropriate endpoint"""
 
@@ -35,6 +74,10 @@ def lambda_handler(event, context):
     http_method = event.get("httpMethod", "POST")
     path = event.get("path", "/analyze")
 
+    # EventBridge schedule - not an API Gateway request
+    if event.get("source") == "aws.events":
+        return handle_change_detection(event, context)
+
     print(f"Request: {http_method} {path}")
 
     try:
@@ -48,6 +91,15 @@ def lambda_handler(event, context):
         elif path == "/report" and http_method == "GET":
             return handle_get_report(event, context)
 
+        elif path == "/history" and http_method == "GET":
+            return handle_history(event, context)
+
+        elif path == "/search" and http_method == "GET":
+            return handle_search(event, context)
+
+        elif path == "/health" and http_method == "GET":
+            return handle_health(event, context)
+
         else:
             return error_response(404, "Endpoint not found")
 
@@ -79,6 +131,13 @@ def handle_analyze(event, context):
             "ticker", company
         )  # Ticker optional, defaults to company name
 
+        # Validate against the symbol directory before any expensive work
+        ticker, company, suggestions = resolve_symbol(company, ticker)
+        if not ticker:
+            return error_response(
+                400, "Unknown ticker or company", suggestions=suggestions
+            )
+
         print(f"Analyzing: {company} ({ticker})")
 
         # Get cached or fresh analysis
@@ -95,7 +154,7 @@ def handle_analyze(event, context):
 def handle_dashboard(event, context):
     """GET /dashboard?page=1 - Return paginated cached companies"""
 
-    global DASHBOARD_CACHE, CACHE_TIMESTAMP
+    global DASHBOARD_CACHE, DASHBOARD_VERSION, CACHE_TIMESTAMP
 
     try:
         # Get page number from query params
@@ -124,8 +183,16 @@ def handle_dashboard(event, context):
 
             # Store in Lambda cache
             DASHBOARD_CACHE = all_companies
+            DASHBOARD_VERSION = make_etag(
+                *sorted(f"{item['ticker']}@{item['timestamp']}" for item in all_companies)
+            )
             CACHE_TIMESTAMP = now
 
+        # Client already has this page of this dashboard version
+        etag = make_etag(DASHBOARD_VERSION, page)
+        if etag_matches(event, etag):
+            return not_modified_response(etag, DASHBOARD_CACHE_CONTROL)
+
         # Convert and sort
         companies = []
         for item in all_companies:
@@ -158,7 +225,8 @@ def handle_dashboard(event, context):
                     "total_companies": total_companies,
                     "per_page": per_page,
                 },
-            }
+            },
+            headers=caching_headers(etag, DASHBOARD_CACHE_CONTROL),
         )
 
     except Exception as e:
@@ -168,7 +236,7 @@ def handle_dashboard(event, context):
 
 
 def handle_get_report(event, context):
-    """GET /report?ticker=AMZN - Get specific cached report"""
+    """GET /report?ticker=AMZN[&ts=<timestamp from /analyze>] - Get specific cached report"""
 
     try:
         params = event.get("queryStringParameters", {}) or {}
@@ -177,13 +245,31 @@ def handle_get_report(event, context):
         if not ticker:
             return error_response(400, "ticker parameter required")
 
-        response = cache_table.get_item(Key={"ticker": ticker.upper()})
+        cache_key = ticker.upper()
+
+        # /analyze may have just run on another instance - our copy must be at least that new
+        min_timestamp = (params.get("ts") or "").replace(" ", "+")
+
+        # Hot tickers are served pre-serialized from Lambda memory
+        cached = report_cache.get(cache_key)
+        if cached and min_timestamp and cached.item.get("timestamp", "") < min_timestamp:
+            report_cache.invalidate(cache_key)
+            cached = None
+        if not cached:
+            response = cache_table.get_item(Key={"ticker": cache_key})
+
+            if "Item" not in response:
+                return error_response(404, f"Company {ticker} not found in cache")
 
-        if "Item" not in response:
-            return error_response(404, f"Company {ticker} not found in cache")
+            # Convert Decimals once, then keep the decoded + serialized copy
+            cached = report_cache.put(cache_key, decimal_to_int(response["Item"]))
 
-        # Convert Decimals before returning
-        return success_response(decimal_to_int(response["Item"]))
+        if etag_matches(event, cached.etag):
+            return not_modified_response(cached.etag, REPORT_CACHE_CONTROL)
+
+        return success_response(
+            body=cached.body, headers=caching_headers(cached.etag, REPORT_CACHE_CONTROL)
+        )
 
     except Exception as e:
         print(f"Get report error: {str(e)}")
@@ -191,58 +277,263 @@ def handle_get_report(event, context):
         return error_response(500, str(e))
 
 
+def handle_history(event, context):
+    """GET /history?ticker=AMZN&from=2025-01-01&to=2025-02-01 - Score trend for a ticker"""
+
+    try:
+        params = event.get("queryStringParameters", {}) or {}
+        ticker = params.get("ticker")
+
+        if not ticker:
+            return error_response(400, "ticker parameter required")
+
+        # a "+" in an unencoded UTC offset arrives as a space
+        start = (params.get("from") or "").replace(" ", "+") or None
+        end = (params.get("to") or "").replace(" ", "+") or None
+        try:
+            start_at = parse_history_bound(start) if start else None
+            end_at = parse_history_bound(end, end=True) if end else None
+        except ValueError:
+            return error_response(400, "from and to must be ISO dates or timestamps")
+        if start_at and end_at and start_at > end_at:
+            return error_response(400, "from must not be after to")
+
+        if not history_enabled():
+            return error_response(503, "Score history is not configured")
+
+        rows = decimal_to_int(query_history(ticker.upper(), start, end))
+
+        return success_response(
+            {
+                "ticker": ticker.upper(),
+                "from": start,
+                "to": end,
+                "history": rows,
+                "changes": summarize_changes(rows),
+            }
+        )
+
+    except Exception as e:
+        print(f"History error: {str(e)}")
+        traceback.print_exc()
+        return error_response(500, str(e))
+
+
+def handle_search(event, context):
+    """GET /search?q=app - Ticker/company autocomplete from the symbol directory"""
+
+    try:
+        params = event.get("queryStringParameters", {}) or {}
+        query = params.get("q", "")
+        limit = params.get("limit", "8")
+        limit = min(max(int(limit), 1), 25) if str(limit).isdigit() else 8
+
+        return success_response(
+            {"query": query, "results": get_symbol_index().search(query, limit=limit)},
+            headers={"Cache-Control": SEARCH_CACHE_CONTROL},
+        )
+
+    except Exception as e:
+        print(f"Search error: {str(e)}")
+        traceback.print_exc()
+        return error_response(500, str(e))
+
+
+def handle_health(event, context):
+    """GET /health - Circuit breaker, report cache and model route state for monitoring"""
+    return success_response(
+        {
+            "circuit_breakers": breaker_status(),
+            "report_cache": report_cache.stats(),
+            "model_routes": router.stats(),
+        }
+    )
+
+
+def handle_change_detection(event, context):
+    """Scheduled (EventBridge) - poll quotes and earnings for cached tickers and only
+    invalidate/refresh the reports whose inputs actually moved"""
+    global DASHBOARD_CACHE, CACHE_TIMESTAMP
+
+    items = []
+    kwargs = {}
+    while True:
+        response = cache_table.scan(**kwargs)
+        items.extend(response.get("Items", []))
+        if "LastEvaluatedKey" not in response:
+            break
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    # skip reports already waiting for regeneration
+    items = [item for item in items if not item.get("invalidated")]
+    now = utc_now()
+
+    # one bulk download for every ticker instead of a full analysis each
+    try:
+        quotes = fetch_bulk_quotes([item["ticker"] for item in items])
+    except Exception as e:
+        print(f"Bulk quote fetch failed: {e}")
+        quotes = {}
+
+    summary = {
+        "checked": len(items),
+        "quoted": len(quotes),
+        "validated": [],
+        "changed": {},
+        "regenerated_meanwhile": [],
+        "failed": {},
+    }
+
+    for item in items:
+        ticker = item["ticker"]
+        try:
+            updates = {}
+            if earnings_due(item, now):
+                try:
+                    item["earnings_dates"] = updates["earnings_dates"] = fetch_earnings_dates(ticker)
+                    item["earnings_checked_at"] = updates["earnings_checked_at"] = now.isoformat()
+                except Exception as e:
+                    print(f"Earnings calendar fetch failed for {ticker}: {e}")
+
+            price = quotes.get(ticker)
+            reason = change_reason(item, price, now)
+            if reason:
+                updates["invalidated"] = reason
+            elif price is not None and price_baseline(item):
+                # quiet ticker - the price held against the report's baseline, vouch for it
+                updates["validated_at"] = now.isoformat()
+                updates["expiresAt"] = int((now + timedelta(hours=CACHE_DURATION_HOURS)).timestamp())
+
+            if updates:
+                update_scanned_item(item, updates)
+                report_cache.invalidate(ticker)
+
+            if reason:
+                print(f"✗ {ticker} changed - {reason}")
+                summary["changed"][ticker] = reason
+                if CHANGE_DETECTION_ACTION == "refresh":
+                    get_or_create_analysis(item["company"], ticker)
+            elif "validated_at" in updates:
+                summary["validated"].append(ticker)
+
+        except Exception as e:
+            if condition_failed(e):
+                # a fresh analysis landed after the scan - it supersedes whatever we found
+                summary["regenerated_meanwhile"].append(ticker)
+                continue
+            print(f"Change detection failed for {ticker}: {e}")
+            summary["failed"][ticker] = str(e)
+
+    if summary["changed"]:
+        DASHBOARD_CACHE = None
+        CACHE_TIMESTAMP = None
+
+    print(
+        f"✓ Change detection: {len(summary['validated'])} quiet, "
+        f"{len(summary['changed'])} changed ({CHANGE_DETECTION_ACTION}), {len(summary['failed'])} failed"
+    )
+    return success_response(summary)
+
+
+def update_scanned_item(item, attributes):
+    """Set a few attributes on a scanned cache item - only if it hasn't been regenerated since the scan"""
+    names = {"#ts": "timestamp"}
+    values = {":scanned_ts": item["timestamp"]}
+    assignments = []
+    for i, (name, value) in enumerate(attributes.items()):
+        names[f"#a{i}"] = name
+        values[f":v{i}"] = value
+        assignments.append(f"#a{i} = :v{i}")
+
+    cache_table.update_item(
+        Key={"ticker": item["ticker"]},
+        UpdateExpression="SET " + ", ".join(assignments),
+        ConditionExpression="#ts = :scanned_ts",
+        ExpressionAttributeNames=names,
+        ExpressionAttributeValues=values,
+    )
+
+
 def get_or_create_analysis(company, ticker):
     """Core caching logic - check cache first, then run agent if needed"""
     global DASHBOARD_CACHE, CACHE_TIMESTAMP
     cache_key = ticker.upper()
 
-    # Try to get from cache
-    try:
-        response = cache_table.get_item(Key={"ticker": cache_key})
+    cached_data = None
 
-        if "Item" in response:
-            cached_data = response["Item"]
+    # Try to get from cache (Lambda memory first, then DynamoDB)
+    try:
+        cached = report_cache.get(cache_key)
+        if not cached:
+            response = cache_table.get_item(Key={"ticker": cache_key})
+            if "Item" in response:
+                cached = report_cache.put(cache_key, decimal_to_int(response["Item"]))
+
+        if cached:
+            cached_data = cached.item
             cached_at = datetime.fromisoformat(cached_data["timestamp"])
-            age_hours = (datetime.now(timezone.utc) - cached_at).total_seconds() / 3600
+            now = datetime.now(timezone.utc)
+            age_hours = (now - cached_at).total_seconds() / 3600
+
+            # A change-detection pass that found nothing moved restarts the freshness clock
+            validated_at = cached_data.get("validated_at")
+            fresh_from = max(cached_at, datetime.fromisoformat(validated_at)) if validated_at else cached_at
+            fresh_hours = (now - fresh_from).total_seconds() / 3600
 
             # Check if cache is still fresh
-            if age_hours < CACHE_DURATION_HOURS:
+            if cached_data.get("invalidated"):
+                print(f"Cache INVALIDATED - {cached_data['invalidated']}, fetching fresh data")
+            elif fresh_hours < CACHE_DURATION_HOURS and age_hours < MAX_REPORT_AGE_HOURS:
                 print(f"✓ Cache HIT - {age_hours:.1f} hours old")
 
-                # Simulate AI thinking for UX (10-15 seconds for cached results)
-                time.sleep(random.uniform(10, 15))
+                # Simulate AI thinking for UX (10-15 seconds for cached results by default)
+                if CACHED_RESPONSE_DELAY_SECONDS > 0:
+                    time.sleep(random.uniform(0.8, 1.2) * CACHED_RESPONSE_DELAY_SECONDS)
 
                 # Return cached data with metadata
-                return decimal_to_int(
-                    {
-                        "cached": True,
-                        "cache_age_hours": round(age_hours, 1),
-                        "company": cached_data["company"],
-                        "ticker": cached_data["ticker"],
-                        "score": cached_data["score"],
-                        "grade": cached_data["grade"],
-                        "timestamp": cached_data["timestamp"],
-                        "full_analysis": cached_data["full_analysis"],
-                    }
-                )
+                return {
+                    "cached": True,
+                    "cache_age_hours": round(age_hours, 1),
+                    "company": cached_data["company"],
+                    "ticker": cached_data["ticker"],
+                    "score": cached_data["score"],
+                    "grade": cached_data["grade"],
+                    "timestamp": cached_data["timestamp"],
+                    "full_analysis": cached_data["full_analysis"],
+                }
             else:
                 print(f"Cache EXPIRED - {age_hours:.1f} hours old, fetching fresh data")
 
     except Exception as e:
         print(f"Cache lookup failed: {e}")
 
-    # Cache miss or expired - run fresh analysis
-    print(f"✗ Cache MISS - Running fresh analysis for {company}...")
+    # Cache miss or expired - fetch tool data and see if the narrative still holds
+    token_report.reset()
+    finances, news = prefetch_tool_outputs(company, ticker)
+    fingerprint = fingerprint_tool_outputs(finances, news)
+    metrics = extract_metrics(finances, news)
+
+    if cached_data and cached_data.get("fingerprint") == fingerprint:
+        print(f"✓ Fingerprint MATCH - reusing narrative for {cache_key}")
+        narrative_reused = True
+        response_text = refresh_key_findings(cached_data["full_analysis"], metrics)
+        score = cached_data["score"]
+        grade = cached_data["grade"]
+    else:
+        print(f"✗ Cache MISS - Running fresh analysis for {company}...")
+        narrative_reused = False
 
-    # Call agent
-    agent_result = company_agent(f"Analyze {company} ({ticker}) for job seekers")
-    response_text = (
-        agent_result.content if hasattr(agent_result, "content") else str(agent_result)
-    )
+        # Call agent (single model call unless ANALYSIS_MODE=agent)
+        agent_result = run_analysis(company, ticker, finances, news)
+        response_text = (
+            agent_result.content if hasattr(agent_result, "content") else str(agent_result)
+        )
+        token_report.record_usage(agent_result)
+        print(f"Token report for {cache_key}: {json.dumps(token_report.summary())}")
 
-    # Extract score and calculate grade
-    score = extract_score(response_text)
-    grade = calculate_grade(score)
+        # Extract score and calculate grade
+        score = extract_score(response_text)
+        grade = calculate_grade(score)
 
     # Prepare cache item
     timestamp = datetime.now(timezone.utc).isoformat()
@@ -261,12 +552,20 @@ def get_or_create_analysis(company, ticker):
         "score": score,
         "grade": grade,
         "full_analysis": response_text,
+        "fingerprint": fingerprint,
+        "metrics": to_dynamo(metrics),
     }
 
+    # keep the earnings calendar change detection already fetched
+    if cached_data and cached_data.get("earnings_checked_at"):
+        cache_item["earnings_dates"] = cached_data.get("earnings_dates", [])
+        cache_item["earnings_checked_at"] = cached_data["earnings_checked_at"]
+
     # Store in cache
     try:
         cache_table.put_item(Item=cache_item)
         print(f"✓ Cached result for {cache_key}")
+        report_cache.put(cache_key, decimal_to_int(cache_item))
         DASHBOARD_CACHE = None
         CACHE_TIMESTAMP = None
         print("✓ Invalidated dashboard cache - fresh data will be fetched")
@@ -275,18 +574,88 @@ def get_or_create_analysis(company, ticker):
         traceback.print_exc()
         # Continue anyway - user still gets their result
 
+    # Append to score history (the cache item above only holds the latest)
+    try:
+        record_history(cache_item)
+    except Exception as e:
+        print(f"Failed to record history: {e}")
+
     # Return fresh analysis
     return {
         "cached": False,
+        "narrative_reused": narrative_reused,
         "company": company,
         "ticker": cache_key,
         "score": score,
         "grade": grade,
         "timestamp": timestamp,
         "full_analysis": response_text,
+        "metrics": metrics,
     }
 
 
+def extract_metrics(finances, news):
+    """Numeric fields refreshed on every run, even when the narrative is reused"""
+    health = finances.get("financial_health") or {}
+    performance = finances.get("stock_performance") or {}
+    analysis = finances.get("analysis") or {}
+    sentiment = news.get("market_sentiment") or {}
+
+    metrics = {
+        "current_price": performance.get("current_price"),
+        "month_high": performance.get("month_high"),
+        "month_low": performance.get("month_low"),
+        "price_change_pct": performance.get("price_change_pct"),
+        "trend": performance.get("trend"),
+        "revenue": health.get("revenue"),
+        "market_cap": health.get("market_cap"),
+        "profit_margin": health.get("profit_margin"),
+        "employees": health.get("employees"),
+        "financial_health_score": analysis.get("financial_health_score"),
+        "sentiment_score": sentiment.get("sentiment_score"),
+    }
+    return {k: v for k, v in metrics.items() if v is not None}
+
+
+def refresh_key_findings(text, metrics):
+    """Rewrite the Key Financial Findings figures of a reused narrative from this run's
+    metrics - the report page parses them out of the text"""
+    margin = metrics.get("profit_margin")
+    employees = metrics.get("employees")
+    figures = {
+        "Annual Revenue": format_money(metrics.get("revenue")),
+        "Market Cap": format_money(metrics.get("market_cap")),
+        "Profit Margin": f"{margin * 100:.1f}%" if margin is not None else None,
+        "Total Employees": f"{int(employees):,}" if employees else None,
+    }
+    for label, value in figures.items():
+        if value is None:
+            continue
+        text = re.sub(
+            rf"^([ \t]*-?[ \t]*\**{label}:\**)[^\n]*",
+            lambda match: f"{match.group(1)} {value}",
+            text,
+            count=1,
+            flags=re.M,
+        )
+    return text
+
+
+def format_money(value):
+    """394328000000 -> '$394.3 billion', matching the report format"""
+    if not value:
+        return None
+    for limit, unit in ((1e12, "trillion"), (1e9, "billion"), (1e6, "million")):
+        if abs(value) >= limit:
+            return f"${value / limit:.1f} {unit}"
+    return f"${value:,.0f}"
+
+
+def to_dynamo(obj):
+    """Convert floats (and numpy numbers) to Decimal so DynamoDB accepts them"""
+    return json.loads(json.dumps(obj, default=float), parse_float=Decimal)
+
+
 def extract_score(text):
     """Extract score from agent response"""
 
@@ -328,8 +697,8 @@ def calculate_grade(score):
     return "D"
 
 
-def success_response(data):
-    """Standard success response with CORS headers"""
+def success_response(data=None, body=None, headers=None):
+    """Standard success response with CORS headers - pass body to skip re-serializing"""
     return {
         "statusCode": 200,
         "headers": {
@@ -337,12 +706,47 @@ def success_response(data):
             "Access-Control-Allow-Headers": "Content-Type",
             "Access-Control-Allow-Methods": "GET,POST,OPTIONS",
             "Content-Type": "application/json",
+            **(headers or {}),
         },
-        "body": json.dumps(data),
+        "body": body if body is not None else json.dumps(data),
     }
 
 
-def error_response(status_code, message):
+def not_modified_response(etag, cache_control):
+    """304 for a conditional GET whose ETag still matches - no body"""
+    return {
+        "statusCode": 304,
+        "headers": {
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Headers": "Content-Type",
+            "Access-Control-Allow-Methods": "GET,POST,OPTIONS",
+            **caching_headers(etag, cache_control),
+        },
+        "body": "",
+    }
+
+
+def caching_headers(etag, cache_control):
+    return {
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Access-Control-Expose-Headers": "ETag",
+    }
+
+
+def etag_matches(event, etag):
+    """True if the request's If-None-Match covers this ETag"""
+    headers = event.get("headers") or {}
+    if_none_match = next(
+        (v for k, v in headers.items() if k.lower() == "if-none-match"), None
+    )
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def error_response(status_code, message, **extra):
     """Standard error response with CORS headers"""
     return {
         "statusCode": status_code,
@@ -352,5 +756,5 @@ def error_response(status_code, message):
             "Access-Control-Allow-Methods": "GET,POST,OPTIONS",
             "Content-Type": "application/json",
         },
-        "body": json.dumps({"error": message}),
+        "body": json.dumps({"error": message, **extra}),
     }
@@ -0,0 +1,219 @@
+import cProfile
+import functools
+import hashlib
+import hmac
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+# profile every invocation (for a debugging deploy, not production traffic)
+PROFILE_REQUESTS = os.environ.get("PROFILE_REQUESTS") == "1"
+
+# lets a single request opt in with a signed X-GrowTheory-Profile header
+PROFILE_SECRET = os.environ.get("PROFILE_SECRET")
+
+# "sample": low-overhead stack sampling of every thread in the process - under the threaded
+#           server that includes other in-flight requests, so profile on a quiet worker
+# "cprofile": deterministic call counts and timings, but only one profile per process at a
+#             time (on 3.12+ it is process-wide, so it also sees pool threads and other requests)
+PROFILE_MODE = os.environ.get("PROFILE_MODE", "sample")
+PROFILE_INTERVAL_SECONDS = float(os.environ.get("PROFILE_INTERVAL_SECONDS", "0.005"))
+PROFILE_TOP_N = int(os.environ.get("PROFILE_TOP_N", "15"))
+
+# where to write a flamegraph-compatible file per profiled request (e.g. /tmp)
+PROFILE_DUMP_DIR = os.environ.get("PROFILE_DUMP_DIR")
+
+PROFILE_HEADER = "x-growtheory-profile"
+SIGNATURE_MAX_AGE_SECONDS = 300
+
+# leaf frames in these files are threads parked waiting for work, not doing it
+IDLE_FILES = ("threading.py", "queue.py")
+
+
+def profiled(handler):
+    """Wrap a Lambda handler so single invocations can be profiled on demand.
+    With profiling unconfigured the handler is returned untouched - zero overhead."""
+    if not PROFILE_REQUESTS and not PROFILE_SECRET:
+        return handler
+
+    @functools.wraps(handler)
+    def wrapper(event, context):
+        if not should_profile(event):
+            return handler(event, context)
+
+        profiler = StackSampler() if PROFILE_MODE == "sample" else CProfiler()
+        try:
+            profiler.start()
+        except Exception as e:
+            # e.g. another request already holds cProfile - serve this one unprofiled
+            print(f"[profile] not profiling {event.get('path')}: {e}")
+            return handler(event, context)
+
+        try:
+            return handler(event, context)
+        finally:
+            profiler.stop()
+            report_profile(profiler, event)
+
+    return wrapper
+
+
+def sign_profile_request(path, timestamp=None, secret=None):
+    """Header value that opts one request into profiling: '<unix time>:<hmac>'"""
+    timestamp = int(timestamp or time.time())
+    key = (secret or PROFILE_SECRET or "").encode()
+    signature = hmac.new(key, f"{timestamp}:{path}".encode(), hashlib.sha256).hexdigest()
+    return f"{timestamp}:{signature}"
+
+
+def should_profile(event):
+    if PROFILE_REQUESTS:
+        return True
+
+    headers = event.get("headers") or {}
+    value = next((v for k, v in headers.items() if k.lower() == PROFILE_HEADER), None)
+    if not value or ":" not in value:
+        return False
+
+    timestamp, _, _ = value.partition(":")
+    if not timestamp.isdigit() or abs(time.time() - int(timestamp)) > SIGNATURE_MAX_AGE_SECONDS:
+        return False
+    expected = sign_profile_request(event.get("path", ""), timestamp)
+    return hmac.compare_digest(value, expected)
+
+
+class StackSampler:
+    """Samples every thread's stack on an interval and folds them flamegraph-style.
+    Process-wide: the handler, its tool/model pool threads and anything else running."""
+
+    def __init__(self, interval=PROFILE_INTERVAL_SECONDS):
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or os.path.basename(frame.f_code.co_filename) in IDLE_FILES:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def summary(self, top_n=PROFILE_TOP_N):
+        """Top functions by self and total (inclusive) samples"""
+        self_samples = Counter()
+        total_samples = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            self_samples[frames[-1]] += count
+            for fn in set(frames):
+                total_samples[fn] += count
+
+        samples = sum(self.stacks.values())
+        denominator = max(1, samples)
+        return {
+            "mode": "sample",
+            "scope": "process",
+            "samples": samples,
+            "interval_ms": self.interval * 1000,
+            "top": [
+                {
+                    "fn": fn,
+                    "self_pct": round(100 * count / denominator, 1),
+                    "total_pct": round(100 * total_samples[fn] / denominator, 1),
+                }
+                for fn, count in self_samples.most_common(top_n)
+            ],
+        }
+
+    def dump(self, path):
+        """Folded stacks - feed to flamegraph.pl or speedscope"""
+        path += ".folded"
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.items():
+                f.write(f"{stack} {count}\n")
+        return path
+
+
+# cProfile can only be enabled once per process (3.12+ raises, older versions clobber)
+_cprofile_lock = threading.Lock()
+
+
+class CProfiler:
+    """cProfile over the handler"""
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        if not _cprofile_lock.acquire(blocking=False):
+            raise RuntimeError("another request is already being profiled with cProfile")
+        try:
+            self.profile.enable()
+        except Exception:
+            _cprofile_lock.release()
+            raise
+
+    def stop(self):
+        try:
+            self.profile.disable()
+        finally:
+            _cprofile_lock.release()
+
+    def summary(self, top_n=PROFILE_TOP_N):
+        stats = pstats.Stats(self.profile, stream=io.StringIO())
+        rows = sorted(stats.stats.items(), key=lambda kv: kv[1][3], reverse=True)[:top_n]
+        return {
+            "mode": "cprofile",
+            "top": [
+                {
+                    "fn": f"{name} ({os.path.basename(filename)}:{line})",
+                    "calls": calls,
+                    "self_ms": round(tottime * 1000, 1),
+                    "total_ms": round(cumtime * 1000, 1),
+                }
+                for (filename, line, name), (_, calls, tottime, cumtime, _) in rows
+            ],
+        }
+
+    def dump(self, path):
+        """pstats file - feed to flameprof or snakeviz"""
+        path += ".prof"
+        self.profile.dump_stats(path)
+        return path
+
+
+def report_profile(profiler, event):
+    """Log a compact hot-function summary and optionally dump the full profile"""
+    try:
+        summary = profiler.summary()
+        summary["path"] = event.get("path")
+        if PROFILE_DUMP_DIR:
+            name = f"{int(time.time() * 1000)}-{event.get('path', '').strip('/') or 'root'}"
+            summary["dump"] = profiler.dump(os.path.join(PROFILE_DUMP_DIR, name))
+        print(f"[profile] {json.dumps(summary)}")
+    except Exception as e:
+        print(f"[profile] failed to report: {e}")
+
+
+if __name__ == "__main__":
+    # print a header value for profiling one request: python profiling.py /analyze
+    print(f"{PROFILE_HEADER}: {sign_profile_request(sys.argv[1] if len(sys.argv) > 1 else '/analyze')}")
@@ -0,0 +1,97 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# per Lambda instance budget for decoded + serialized reports
+REPORT_CACHE_MAX_BYTES = int(os.getenv("REPORT_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+
+# bounds how stale a report can be when another instance rewrites it
+REPORT_CACHE_TTL_SECONDS = int(os.getenv("REPORT_CACHE_TTL_SECONDS", "300"))
+
+
+def make_etag(*parts):
+    """Strong ETag from the values that identify a response version"""
+    digest = hashlib.sha256("|".join(str(p) for p in parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+class CachedReport:
+    """A decoded report item plus its pre-serialized JSON body and ETag"""
+
+    __slots__ = ("item", "body", "etag", "size", "expires_at")
+
+    def __init__(self, item, ttl_seconds):
+        self.item = item
+        self.body = json.dumps(item, sort_keys=True)
+        # change detection rewrites fields without a new timestamp, so version the body itself
+        self.etag = make_etag(self.body)
+        # body dominates; the decoded item is roughly the same size again
+        self.size = 2 * len(self.body.encode())
+        self.expires_at = time.monotonic() + ttl_seconds
+
+
+class ReportCache:
+    """Size-bounded (bytes) LRU with TTL for /report and cached-analysis lookups"""
+
+    def __init__(self, max_bytes=REPORT_CACHE_MAX_BYTES, ttl_seconds=REPORT_CACHE_TTL_SECONDS):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Return the CachedReport for key, or None on miss/expiry"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, item):
+        """Serialize and cache a decoded item. Returns the CachedReport even if it was too big to keep."""
+        entry = CachedReport(item, self.ttl_seconds)
+        with self._lock:
+            self._remove(key)
+            if entry.size > self.max_bytes:
+                return entry
+            while self.bytes_used + entry.size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+            self._entries[key] = entry
+            self.bytes_used += entry.size
+        return entry
+
+    def invalidate(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes_used": self.bytes_used,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes_used -= entry.size
@@ -0,0 +1,95 @@
+import os
+from datetime import datetime, timezone
+from boto3.dynamodb.conditions import Key
+from storage import CACHE_BACKEND, open_table
+
+# Append-only score history: partition key "ticker", sort key "timestamp" (ISO 8601)
+HISTORY_TABLE_NAME = os.environ.get("COMPANY_HISTORY_TABLE_NAME")
+
+# local backends always keep history, DynamoDB needs a table configured
+history_table = (
+    open_table(HISTORY_TABLE_NAME or "company_history", "ticker", "timestamp")
+    if HISTORY_TABLE_NAME or CACHE_BACKEND != "dynamodb"
+    else None
+)
+
+
+def history_enabled():
+    return history_table is not None
+
+
+def record_history(cache_item):
+    """Append a compact score/grade/metrics row for one analysis - no narrative"""
+    if history_table is None:
+        return
+    history_table.put_item(
+        Item={
+            "ticker": cache_item["ticker"],
+            "timestamp": cache_item["timestamp"],
+            "score": cache_item["score"],
+            "grade": cache_item["grade"],
+            "fingerprint": cache_item.get("fingerprint"),
+            "metrics": cache_item.get("metrics", {}),
+        }
+    )
+
+
+def parse_history_bound(value, end=False):
+    """Datetime for a from/to parameter - ISO date or timestamp, a bare date as the upper
+    bound meaning the end of that day. Raises ValueError for anything else."""
+    if len(value) == 10:
+        value += "T23:59:59.999999+00:00" if end else "T00:00:00+00:00"
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def query_history(ticker, start=None, end=None):
+    """Rows for a ticker between two ISO timestamps/dates (inclusive), oldest first"""
+    condition = Key("ticker").eq(ticker)
+
+    # a bare date as the upper bound means "through the end of that day"
+    if end and len(end) == 10:
+        end += "T23:59:59.999999+00:00"
+
+    if hasattr(history_table, "query_range"):
+        return history_table.query_range(ticker, start, end)
+
+    if start and end:
+        condition &= Key("timestamp").between(start, end)
+    elif start:
+        condition &= Key("timestamp").gte(start)
+    elif end:
+        condition &= Key("timestamp").lte(end)
+
+    # one key-condition query, following pages if the range is large
+    rows = []
+    kwargs = {"KeyConditionExpression": condition, "ScanIndexForward": True}
+    while True:
+        response = history_table.query(**kwargs)
+        rows.extend(response.get("Items", []))
+        if "LastEvaluatedKey" not in response:
+            return rows
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def summarize_changes(rows):
+    """What changed between the two most recent rows, or None with fewer than two"""
+    if len(rows) < 2:
+        return None
+
+    previous, latest = rows[-2], rows[-1]
+    previous_price = (previous.get("metrics") or {}).get("current_price")
+    latest_price = (latest.get("metrics") or {}).get("current_price")
+
+    price_change_pct = None
+    if previous_price and latest_price:
+        price_change_pct = round((latest_price - previous_price) / previous_price * 100, 2)
+
+    return {
+        "since": previous["timestamp"],
+        "score_delta": latest["score"] - previous["score"],
+        "grade_changed": latest["grade"] != previous["grade"],
+        "previous_grade": previous["grade"],
+        "price_change_pct": price_change_pct,
+        "inputs_changed": latest.get("fingerprint") != previous.get("fingerprint"),
+    }
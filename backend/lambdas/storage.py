@@ -0,0 +1,215 @@
+import boto3
+import json
+import os
+import re
+import sqlite3
+import threading
+from decimal import Decimal
+
+# "dynamodb" (Lambda default), "memory" or "sqlite" for self-hosted/local runs
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "dynamodb")
+SQLITE_PATH = os.environ.get("SQLITE_PATH", "growtheory.db")
+
+
+def open_table(table_name, partition_key, sort_key=None):
+    """A table for the configured backend - boto3 Table or a local stand-in with the same calls"""
+    if CACHE_BACKEND == "dynamodb":
+        return boto3.resource("dynamodb").Table(table_name)
+    if CACHE_BACKEND == "memory":
+        return MemoryTable(partition_key, sort_key)
+    if CACHE_BACKEND == "sqlite":
+        return SQLiteTable(SQLITE_PATH, table_name, partition_key, sort_key)
+    raise ValueError(f"Unknown CACHE_BACKEND: {CACHE_BACKEND}")
+
+
+def _encode(item):
+    return json.dumps(item, default=float)
+
+
+def _decode(text):
+    # numbers come back as Decimal, same as DynamoDB
+    return json.loads(text, parse_float=Decimal, parse_int=Decimal)
+
+
+class ConditionalCheckFailedException(Exception):
+    """Local stand-in for DynamoDB's failed ConditionExpression error"""
+
+
+def condition_failed(error):
+    """True for a failed ConditionExpression from boto3 or a local table"""
+    if isinstance(error, ConditionalCheckFailedException):
+        return True
+    return getattr(error, "response", {}).get("Error", {}).get("Code") == "ConditionalCheckFailedException"
+
+
+def _apply_update(item, update_expression, condition_expression, names, values):
+    """Apply the UpdateExpression subset we use - "SET a = :a, #b = :b REMOVE c" -
+    after checking an AND-joined "#a = :a" ConditionExpression"""
+    def attr(token):
+        token = token.strip()
+        return names.get(token, token)
+
+    if condition_expression:
+        for clause in re.split(r"\s+AND\s+", condition_expression.strip(), flags=re.I):
+            name, _, value = clause.partition("=")
+            if item is None or item.get(attr(name)) != values[value.strip()]:
+                raise ConditionalCheckFailedException(condition_expression)
+
+    for action, clause in re.findall(
+        r"\b(SET|REMOVE)\s+(.*?)(?=\s+(?:SET|REMOVE)\s|$)", update_expression.strip(), flags=re.S | re.I
+    ):
+        for part in clause.split(","):
+            if action.upper() == "SET":
+                name, _, value = part.partition("=")
+                item[attr(name)] = values[value.strip()]
+            else:
+                item.pop(attr(part), None)
+    return item
+
+
+class MemoryTable:
+    """In-process table supporting the subset of the DynamoDB Table API we use"""
+
+    def __init__(self, partition_key, sort_key=None):
+        self.partition_key = partition_key
+        self.sort_key = sort_key
+        self._items = {}
+        self._lock = threading.Lock()
+
+    def _key(self, item):
+        return (item[self.partition_key], item.get(self.sort_key, "") if self.sort_key else "")
+
+    def get_item(self, Key):
+        with self._lock:
+            text = self._items.get(self._key(Key))
+        return {"Item": _decode(text)} if text else {}
+
+    def put_item(self, Item):
+        with self._lock:
+            self._items[self._key(Item)] = _encode(Item)
+
+    def update_item(
+        self,
+        Key,
+        UpdateExpression,
+        ConditionExpression=None,
+        ExpressionAttributeNames=None,
+        ExpressionAttributeValues=None,
+    ):
+        with self._lock:
+            text = self._items.get(self._key(Key))
+            item = _decode(text) if text else None
+            if item is None and not ConditionExpression:
+                item = dict(Key)
+            item = _apply_update(
+                item,
+                UpdateExpression,
+                ConditionExpression,
+                ExpressionAttributeNames or {},
+                _decode(_encode(ExpressionAttributeValues or {})),
+            )
+            self._items[self._key(Key)] = _encode(item)
+
+    def delete_item(self, Key):
+        with self._lock:
+            self._items.pop(self._key(Key), None)
+
+    def scan(self, **kwargs):
+        with self._lock:
+            texts = list(self._items.values())
+        return {"Items": [_decode(text) for text in texts]}
+
+    def query_range(self, partition_value, start=None, end=None):
+        """Items in one partition with start <= sort key <= end, sorted ascending"""
+        with self._lock:
+            matches = sorted(
+                (key[1], text)
+                for key, text in self._items.items()
+                if key[0] == partition_value
+                and (start is None or key[1] >= start)
+                and (end is None or key[1] <= end)
+            )
+        return [_decode(text) for _, text in matches]
+
+
+class SQLiteTable:
+    """SQLite-backed table - survives restarts and can be shared by worker processes"""
+
+    def __init__(self, path, table_name, partition_key, sort_key=None):
+        self.partition_key = partition_key
+        self.sort_key = sort_key
+        self.table_name = "".join(c if c.isalnum() else "_" for c in table_name)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table_name} "
+                "(pk TEXT NOT NULL, sk TEXT NOT NULL, item TEXT NOT NULL, PRIMARY KEY (pk, sk))"
+            )
+
+    def _key(self, item):
+        return (str(item[self.partition_key]), str(item.get(self.sort_key, "")) if self.sort_key else "")
+
+    def get_item(self, Key):
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT item FROM {self.table_name} WHERE pk = ? AND sk = ?", self._key(Key)
+            ).fetchone()
+        return {"Item": _decode(row[0])} if row else {}
+
+    def put_item(self, Item):
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table_name} (pk, sk, item) VALUES (?, ?, ?)",
+                (*self._key(Item), _encode(Item)),
+            )
+
+    def update_item(
+        self,
+        Key,
+        UpdateExpression,
+        ConditionExpression=None,
+        ExpressionAttributeNames=None,
+        ExpressionAttributeValues=None,
+    ):
+        # read-modify-write in one transaction so worker processes can't interleave
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            row = self._conn.execute(
+                f"SELECT item FROM {self.table_name} WHERE pk = ? AND sk = ?", self._key(Key)
+            ).fetchone()
+            item = _decode(row[0]) if row else None
+            if item is None and not ConditionExpression:
+                item = dict(Key)
+            item = _apply_update(
+                item,
+                UpdateExpression,
+                ConditionExpression,
+                ExpressionAttributeNames or {},
+                _decode(_encode(ExpressionAttributeValues or {})),
+            )
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table_name} (pk, sk, item) VALUES (?, ?, ?)",
+                (*self._key(Key), _encode(item)),
+            )
+
+    def delete_item(self, Key):
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"DELETE FROM {self.table_name} WHERE pk = ? AND sk = ?", self._key(Key)
+            )
+
+    def scan(self, **kwargs):
+        with self._lock:
+            rows = self._conn.execute(f"SELECT item FROM {self.table_name}").fetchall()
+        return {"Items": [_decode(row[0]) for row in rows]}
+
+    def query_range(self, partition_value, start=None, end=None):
+        """Items in one partition with start <= sort key <= end, sorted ascending"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT item FROM {self.table_name} WHERE pk = ? AND sk >= ? AND sk <= ? ORDER BY sk",
+                (partition_value, start or "", end or "\uffff"),
+            ).fetchall()
+        return [_decode(row[0]) for row in rows]
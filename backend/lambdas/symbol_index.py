@@ -0,0 +1,254 @@
+import bisect
+import difflib
+import json
+import os
+import re
+import threading
+import time
+import requests
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# bundled listings, merged in order (later files' names/aliases win):
+# full exchange symbol files from nasdaqtrader.com (fetched into the image by the Dockerfile),
+# then the frontend's curated {"AAPL": {"default": "Apple Inc.", "aliases": ["Apple", ...]}}
+# directory - copied into data/ in the image, read from the frontend in a checkout
+SYMBOL_LISTING_PATHS = os.getenv(
+    "SYMBOL_LISTING_PATH",
+    os.pathsep.join(
+        [
+            os.path.join(DATA_DIR, "nasdaqlisted.txt"),
+            os.path.join(DATA_DIR, "otherlisted.txt"),
+            os.path.join(DATA_DIR, "companies.json"),
+            os.path.join(REPO_DIR, "frontend", "src", "data", "companies.json"),
+        ]
+    ),
+).split(os.pathsep)
+
+# optional fresher listing - same JSON format, or a pipe-delimited exchange symbol file
+SYMBOL_LISTING_URL = os.getenv("SYMBOL_LISTING_URL")
+SYMBOL_REFRESH_HOURS = float(os.getenv("SYMBOL_REFRESH_HOURS", "24"))
+
+# "strict": only listed tickers are analyzed (the image sets this - it ships full exchange listings)
+# "format": unlisted input is allowed through if it looks like a ticker and
+#           isn't a near miss for a listed company
+SYMBOL_VALIDATION = os.getenv("SYMBOL_VALIDATION", "format")
+
+TICKER_PATTERN = re.compile(r"^[A-Z][A-Z0-9.\-]{0,9}$")
+FUZZY_CUTOFF = 0.75
+
+# "Palantir Technologies Inc." is also indexed as "palantir technologies"
+CORPORATE_SUFFIXES = {"inc", "corp", "corporation", "co", "company", "ltd", "plc", "llc", "lp", "sa", "ag", "nv"}
+
+
+def normalize_term(text):
+    """Lowercase, drop punctuation and collapse whitespace for name matching"""
+    return " ".join(re.sub(r"[^a-z0-9 ]+", " ", text.lower()).split())
+
+
+def parse_listing(text):
+    """Turn a listing file into {ticker: (name, [aliases])}"""
+    text = text.strip()
+    if text.startswith("{"):
+        return {
+            ticker.upper(): (entry.get("default", ticker), entry.get("aliases", []))
+            for ticker, entry in json.loads(text).items()
+        }
+
+    # nasdaqlisted.txt / otherlisted.txt style: header row, "|" separated, footer row
+    lines = text.splitlines()
+    header = lines[0].split("|")
+    symbol_col = next(i for i, col in enumerate(header) if "Symbol" in col)
+    name_col = header.index("Security Name")
+    test_col = header.index("Test Issue") if "Test Issue" in header else None
+    listing = {}
+    for line in lines[1:]:
+        cols = line.split("|")
+        if len(cols) <= max(symbol_col, name_col) or line.startswith("File Creation Time"):
+            continue
+        if test_col is not None and cols[test_col] == "Y":
+            continue
+        # "Apple Inc. - Common Stock" -> "Apple Inc."
+        name = cols[name_col].split(" - ")[0].strip()
+        listing[cols[symbol_col].upper()] = (name, [])
+    return listing
+
+
+def load_listings(paths, downloaded=None):
+    """Merge every listing file that exists - later files override names and add aliases.
+    A downloaded listing slots in after the exchange files, before the curated JSON aliases."""
+    listings = []
+    for path in paths:
+        if downloaded is not None and path.endswith(".json"):
+            listings.append(downloaded)
+            downloaded = None
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding="utf-8") as f:
+            listings.append(parse_listing(f.read()))
+        print(f"✓ Loaded symbols from {path}")
+    if downloaded is not None:
+        listings.append(downloaded)
+
+    merged = {}
+    for listing in listings:
+        for ticker, (name, aliases) in listing.items():
+            _, previous_aliases = merged.get(ticker, (name, []))
+            merged[ticker] = (name, previous_aliases + list(aliases))
+    return merged
+
+
+class SymbolIndex:
+    """Sorted-array symbol directory for ticker validation and autocomplete"""
+
+    def __init__(self, listing):
+        self.names = {ticker: name for ticker, (name, _) in listing.items()}
+        self.tickers = sorted(self.names)
+
+        # every name/alias as (normalized term, ticker), sorted for prefix search
+        terms = set()
+        for ticker, (name, aliases) in listing.items():
+            for term in [name, *aliases]:
+                normalized = normalize_term(term)
+                if normalized:
+                    terms.add((normalized, ticker))
+                words = normalized.split()
+                while len(words) > 1 and words[-1] in CORPORATE_SUFFIXES:
+                    words.pop()
+                    terms.add((" ".join(words), ticker))
+        self.terms = sorted(terms)
+        self.term_keys = [term for term, _ in self.terms]
+        self.exact_terms = {}
+        for term, ticker in self.terms:
+            self.exact_terms.setdefault(term, ticker)
+
+        # fuzzy matching only scans terms sharing the query's first letter
+        self.terms_by_initial = {}
+        for term in self.term_keys:
+            self.terms_by_initial.setdefault(term[0], []).append(term)
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def lookup(self, text):
+        """Exact ticker or exact name/alias -> ticker, else None"""
+        if not text:
+            return None
+        ticker = text.strip().upper()
+        if ticker in self.names:
+            return ticker
+        return self.exact_terms.get(normalize_term(text))
+
+    def search(self, query, limit=8):
+        """Prefix matches on ticker, then name/alias, then fuzzy name matches"""
+        results = []
+        seen = set()
+
+        def add(ticker):
+            if ticker not in seen and len(results) < limit:
+                seen.add(ticker)
+                results.append({"ticker": ticker, "name": self.names[ticker]})
+
+        symbol = query.strip().upper()
+        term = normalize_term(query)
+        if not symbol:
+            return results
+
+        if symbol in self.names:
+            add(symbol)
+        for ticker in _prefix_slice(self.tickers, self.tickers, symbol):
+            add(ticker)
+        if term:
+            for _, ticker in _prefix_slice(self.term_keys, self.terms, term):
+                add(ticker)
+
+        if len(results) < limit:
+            for ticker in self.near_misses(query, limit):
+                add(ticker)
+
+        return results
+
+    def near_misses(self, text, limit=5):
+        """Tickers whose name/alias is a close (typo-distance) match for text"""
+        term = normalize_term(text or "")
+        if len(term) < 3:
+            return []
+        candidates = self.terms_by_initial.get(term[0], [])
+        matches = difflib.get_close_matches(term, candidates, n=limit, cutoff=FUZZY_CUTOFF)
+        return list(dict.fromkeys(self.exact_terms[match] for match in matches))
+
+
+def _prefix_slice(keys, values, prefix):
+    start = bisect.bisect_left(keys, prefix)
+    end = bisect.bisect_left(keys, prefix + "\uffff")
+    return values[start:end]
+
+
+_index = None
+_loaded_at = 0.0
+_refreshing = False
+_lock = threading.Lock()
+
+
+def get_symbol_index():
+    """Current index - loads the bundled listings once, refreshes from SYMBOL_LISTING_URL in the background"""
+    global _index, _loaded_at, _refreshing
+
+    with _lock:
+        if _index is None:
+            try:
+                _index = SymbolIndex(load_listings(SYMBOL_LISTING_PATHS))
+                print(f"✓ {len(_index)} symbols in directory")
+            except Exception as e:
+                print(f"Symbol listing unavailable: {e}")
+                _index = SymbolIndex({})
+
+        # never block a request on the network - keep serving the current index meanwhile
+        stale = time.time() - _loaded_at > SYMBOL_REFRESH_HOURS * 3600
+        if SYMBOL_LISTING_URL and stale and not _refreshing:
+            _loaded_at = time.time()
+            _refreshing = True
+            threading.Thread(target=_refresh_from_url, daemon=True).start()
+
+        return _index
+
+
+def _refresh_from_url():
+    global _index, _refreshing
+    try:
+        response = requests.get(SYMBOL_LISTING_URL, timeout=10)
+        response.raise_for_status()
+        # on top of the bundled listings, so curated names and aliases survive the refresh
+        index = SymbolIndex(load_listings(SYMBOL_LISTING_PATHS, parse_listing(response.text)))
+        with _lock:
+            _index = index
+        print(f"✓ Refreshed {len(index)} symbols from {SYMBOL_LISTING_URL}")
+    except Exception as e:
+        # keep serving the listing we already have
+        print(f"Symbol listing refresh failed: {e}")
+    finally:
+        with _lock:
+            _refreshing = False
+
+
+def resolve_symbol(company, ticker):
+    """Normalize analyze input to (ticker, company name, suggestions) - ticker is None if it can't be a real symbol"""
+    index = get_symbol_index()
+
+    for candidate in (ticker, company):
+        match = index.lookup(candidate)
+        if match:
+            name = company if company and company.upper() != match else index.names[match]
+            return match, name, []
+
+    symbol = (ticker or company or "").strip().upper()
+    if len(index) == 0:
+        return symbol, company or symbol, []
+
+    # a near miss for a listed company ("Amazn") is a typo, not an unlisted ticker
+    text = ticker or company or ""
+    if SYMBOL_VALIDATION == "format" and TICKER_PATTERN.match(symbol) and not index.near_misses(text):
+        return symbol, company or symbol, []
+
+    return None, None, index.search(text, limit=5)
@@ -0,0 +1,173 @@
+"""
+Self-hosted GrowTheory server: the Lambda route handlers served over HTTP.
+
+    python server.py --port 8000 --workers 4 --threads 16
+    uvicorn server:app --workers 4        # or run the ASGI app directly
+
+Uses uvicorn (ASGI, multiple worker processes) when it is installed, otherwise a
+stdlib HTTP server with a bounded thread pool. Defaults to the SQLite cache backend
+so no DynamoDB is needed; set CACHE_BACKEND=memory|dynamodb to change that, and
+MODEL_ROUTES=stub to load-test without Bedrock. Cache hits answer immediately
+(CACHED_RESPONSE_DELAY_SECONDS=0) rather than simulating the Lambda's thinking delay.
+"""
+import argparse
+import asyncio
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+os.environ.setdefault("CACHE_BACKEND", "sqlite")
+# the Lambda's simulated "thinking" delay on cache hits would just pin handler threads here
+os.environ.setdefault("CACHED_RESPONSE_DELAY_SECONDS", "0")
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, "lambdas"))
+from lambda_handler import lambda_handler
+
+CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "Content-Type,If-None-Match",
+    "Access-Control-Allow-Methods": "GET,POST,OPTIONS",
+}
+
+_executor = None
+
+
+def get_executor():
+    """Thread pool the blocking handlers run on (SERVER_THREADS per worker process)"""
+    global _executor
+    if _executor is None:
+        threads = int(os.environ.get("SERVER_THREADS", "16"))
+        _executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="handler")
+    return _executor
+
+
+def build_event(method, target, headers, body):
+    """Translate an HTTP request into the API Gateway proxy event lambda_handler expects"""
+    parts = urlsplit(target)
+    return {
+        "httpMethod": method,
+        "path": parts.path,
+        "queryStringParameters": dict(parse_qsl(parts.query)) or None,
+        "headers": headers,
+        "body": body or None,
+    }
+
+
+def handle(event):
+    # API Gateway answers CORS preflight for the Lambda; here we do it ourselves
+    if event["httpMethod"] == "OPTIONS":
+        return {"statusCode": 204, "headers": CORS_HEADERS, "body": ""}
+    return lambda_handler(event, None)
+
+
+async def app(scope, receive, send):
+    """ASGI entry point"""
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    if scope["type"] != "http":
+        return
+
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+
+    target = scope["path"]
+    if scope.get("query_string"):
+        target += "?" + scope["query_string"].decode("latin-1")
+    headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]}
+    event = build_event(scope["method"], target, headers, body.decode())
+
+    # handlers and the upstream SDKs block, so they run on the pool and the event loop stays free
+    loop = asyncio.get_running_loop()
+    response = await loop.run_in_executor(get_executor(), handle, event)
+
+    await send(
+        {
+            "type": "http.response.start",
+            "status": response["statusCode"],
+            "headers": [
+                (k.lower().encode("latin-1"), str(v).encode("latin-1"))
+                for k, v in response["headers"].items()
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": response["body"].encode()})
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """stdlib fallback when uvicorn isn't installed"""
+
+    def _serve(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode() if length else ""
+        response = handle(build_event(self.command, self.path, dict(self.headers), body))
+
+        payload = response["body"].encode()
+        self.send_response(response["statusCode"])
+        for key, value in response["headers"].items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST = do_OPTIONS = _serve
+
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer that handles each connection on the shared bounded thread pool"""
+
+    def process_request(self, request, client_address):
+        get_executor().submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run GrowTheory as a self-hosted HTTP server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (uvicorn only)")
+    parser.add_argument("--threads", type=int, default=16, help="handler threads per worker")
+    args = parser.parse_args()
+
+    # worker processes re-import this module, so pass pool size through the environment
+    os.environ["SERVER_THREADS"] = str(args.threads)
+
+    try:
+        import uvicorn
+    except ImportError:
+        uvicorn = None
+
+    if uvicorn:
+        print(f"Serving on {args.host}:{args.port} ({args.workers} workers x {args.threads} threads)")
+        uvicorn.run("server:app", host=args.host, port=args.port, workers=args.workers, app_dir=BACKEND_DIR)
+        return
+
+    if args.workers > 1:
+        print("[WARNING] uvicorn not installed - running a single worker process")
+    print(f"Serving on {args.host}:{args.port} ({args.threads} threads)")
+    PooledHTTPServer((args.host, args.port), RequestHandler).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
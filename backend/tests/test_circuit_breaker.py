@@ -0,0 +1,166 @@
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+class MemoryStore:
+    """Stand-in for DynamoDBBreakerStore shared by two breakers"""
+
+    def __init__(self):
+        self.records = {}
+
+    def load(self, name):
+        return self.records.get(name)
+
+    def save(self, name, state, opened_at):
+        self.records[name] = {"state": state, "opened_at": opened_at, "updated_at": time.time()}
+
+
+class HTTPError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.response = type("Response", (), {"status_code": status_code})()
+
+
+def fail(error):
+    def fn():
+        raise error
+    return fn
+
+
+def calls(breaker, fn, times):
+    for _ in range(times):
+        try:
+            breaker.call(fn)
+        except Exception:
+            pass
+
+
+print("=" * 50)
+print("Testing circuit breaker (offline)")
+print("=" * 50)
+
+# Test 1: opens after the threshold and fails fast without calling the provider
+print("\n1. Testing open after threshold...")
+breaker = CircuitBreaker("test", failure_threshold=3, reset_seconds=60)
+calls(breaker, fail(ConnectionError("down")), 3)
+assert breaker.state == OPEN
+called = []
+try:
+    breaker.call(lambda: called.append(1))
+    raise AssertionError("call went through an open circuit")
+except CircuitOpenError:
+    pass
+assert not called
+print(f"   ✓ {breaker.status()}")
+
+# Test 2: failures from calls in flight when it opened don't re-trip it
+print("\n2. Testing late failures while open...")
+breaker = CircuitBreaker("test", failure_threshold=3, reset_seconds=60)
+for _ in range(6):
+    breaker.record_failure()
+assert breaker.status()["trip_count"] == 1, breaker.status()
+print("   ✓ Six failures, one trip")
+
+# Test 3: per-request errors and 4xx don't count, 5xx and timeouts do
+print("\n3. Testing failure classification...")
+breaker = CircuitBreaker("test", failure_threshold=3, reset_seconds=60)
+calls(breaker, fail(KeyError("NOTATICKER")), 5)
+calls(breaker, fail(HTTPError(404)), 5)
+assert breaker.state == CLOSED and breaker.failures == 0
+calls(breaker, fail(HTTPError(503)), 2)
+calls(breaker, fail(TimeoutError("read timed out")), 1)
+assert breaker.state == OPEN
+print("   ✓ Typos and 4xx ignored, 5xx/timeouts trip it")
+
+# Test 4: half-open lets one trial through, success closes it
+print("\n4. Testing half-open recovery...")
+breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=0.1)
+calls(breaker, fail(ConnectionError("down")), 1)
+time.sleep(0.15)
+assert breaker.allow() and breaker.state == HALF_OPEN
+assert not breaker.allow()
+breaker.record_success()
+assert breaker.state == CLOSED
+print("   ✓ One trial call, then closed")
+
+# Test 5: a failed trial reopens it
+print("\n5. Testing failed trial...")
+breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=0.1)
+calls(breaker, fail(ConnectionError("down")), 1)
+time.sleep(0.15)
+calls(breaker, fail(ConnectionError("still down")), 1)
+assert breaker.state == OPEN and breaker.status()["trip_count"] == 2
+print("   ✓ Reopened")
+
+# Test 6: shared store spreads open and closed state between instances
+print("\n6. Testing shared state...")
+import tools.circuit_breaker as circuit_breaker
+
+circuit_breaker.SHARED_SYNC_SECONDS = 0
+store = MemoryStore()
+instance_a = CircuitBreaker("yahoo", failure_threshold=1, reset_seconds=60, store=store)
+instance_b = CircuitBreaker("yahoo", failure_threshold=1, reset_seconds=60, store=store)
+calls(instance_a, fail(ConnectionError("down")), 1)
+assert not instance_b.allow() and instance_b.state == OPEN
+time.sleep(0.01)
+instance_a.state = HALF_OPEN
+instance_a.record_success()
+assert instance_b.allow() and instance_b.state == CLOSED
+print("   ✓ Instance B followed instance A open, then closed")
+
+# Test 7: NewsAPI reports errors as codes, not HTTP statuses
+print("\n7. Testing NewsAPI error codes...")
+
+
+class NewsAPIException(Exception):
+    """Same shape as newsapi.newsapi_exception.NewsAPIException"""
+
+    def __init__(self, code):
+        super().__init__({"status": "error", "code": code})
+        self.code_value = code
+
+    def get_code(self):
+        return self.code_value
+
+    def get_status(self):
+        return "error"
+
+
+breaker = CircuitBreaker("newsapi", failure_threshold=2, reset_seconds=60)
+calls(breaker, fail(NewsAPIException("parameterInvalid")), 3)
+assert breaker.state == CLOSED
+calls(breaker, fail(NewsAPIException("unexpectedError")), 2)
+assert breaker.state == OPEN
+print("   ✓ Bad parameters ignored, server errors trip it")
+
+# Test 8: a FRED 5xx reaches the breaker as an HTTP error
+print("\n8. Testing FRED server errors...")
+import requests
+from tools import financial_analyzer
+
+
+def fred_down(url, **kwargs):
+    response = requests.models.Response()
+    response.status_code = 503
+    response.url = url
+    return response
+
+
+original_get = financial_analyzer.requests.get
+financial_analyzer.requests.get = fred_down
+try:
+    breaker = CircuitBreaker("fred", failure_threshold=2, reset_seconds=60)
+    calls(breaker, financial_analyzer.fetch_fred_indicators, 2)
+    assert breaker.state == OPEN, breaker.status()
+finally:
+    financial_analyzer.requests.get = original_get
+print("   ✓ FRED 503 opened the circuit")
+
+print("\n" + "=" * 50)
+print("Circuit Breaker Test Complete! ✓")
+print("=" * 50)
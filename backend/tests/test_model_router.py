@@ -0,0 +1,115 @@
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.model_router import LatencyHistogram, ModelRouter, StubModelBackend
+from tools import prefetch
+
+print("=" * 50)
+print("Testing model router (offline, stub backends)")
+print("=" * 50)
+
+# Test 1: healthy primary answers, fallback never called
+print("\n1. Testing fast primary...")
+primary = StubModelBackend("primary", response="primary says 8/10")
+fallback = StubModelBackend("fallback", response="fallback says 6/10")
+router = ModelRouter([primary, fallback], default_hedge_delay=1)
+result = router.invoke("system", "Analyze AAPL")
+assert result == "primary says 8/10", result
+assert fallback.calls == 0
+print("   ✓ Primary answered, no hedge")
+
+# Test 2: slow primary gets hedged, fallback wins
+print("\n2. Testing hedge on slow primary...")
+primary = StubModelBackend("primary", response="slow", latency=2)
+fallback = StubModelBackend("fallback", response="fast")
+router = ModelRouter([primary, fallback], default_hedge_delay=0.2)
+start = time.monotonic()
+result = router.invoke("system", "Analyze AAPL")
+elapsed = time.monotonic() - start
+assert result == "fast", result
+assert elapsed < 1, elapsed
+print(f"   ✓ Fallback answered after {elapsed:.2f}s")
+
+# Test 3: failing primary fails over immediately
+print("\n3. Testing failover on error...")
+primary = StubModelBackend("primary", error=RuntimeError("ThrottlingException"))
+fallback = StubModelBackend("fallback", response="fallback")
+router = ModelRouter([primary, fallback], default_hedge_delay=30)
+start = time.monotonic()
+assert router.invoke("system", "Analyze AAPL") == "fallback"
+assert time.monotonic() - start < 1
+assert router.stats()["primary"]["errors"] == 1
+print("   ✓ Failed over without waiting for the hedge delay")
+
+# Test 4: all routes failing raises the last error
+print("\n4. Testing all routes down...")
+router = ModelRouter(
+    [
+        StubModelBackend("a", error=RuntimeError("a down")),
+        StubModelBackend("b", error=RuntimeError("b down")),
+    ]
+)
+try:
+    router.invoke("system", "Analyze AAPL")
+    print("   ✗ Expected an error")
+    sys.exit(1)
+except RuntimeError as e:
+    print(f"   ✓ Raised: {e}")
+
+# Test 5: hedge delay follows the primary's p95 once it has samples
+print("\n5. Testing p95-based hedge delay...")
+primary = StubModelBackend("primary")
+router = ModelRouter([primary], default_hedge_delay=45, min_samples=20)
+for _ in range(19):
+    router.histograms["primary"].record(4.0)
+router.histograms["primary"].record(30.0)
+delay = router.hedge_delay(primary)
+assert delay == 5, delay
+print(f"   ✓ Hedge delay {delay}s from histogram {router.stats()['primary']}")
+
+# Test 6: a cold-start router hedges on latencies pooled by other instances
+print("\n6. Testing shared latency samples after a cold start...")
+
+
+class MemoryLatencyStore:
+    def __init__(self):
+        self.counts = {}
+
+    def add(self, name, index):
+        counts = self.counts.setdefault(name, [0] * (len(LatencyHistogram.BUCKETS) + 1))
+        counts[index] += 1
+
+    def load(self, name):
+        return list(self.counts.get(name, [0] * (len(LatencyHistogram.BUCKETS) + 1)))
+
+
+store = MemoryLatencyStore()
+warm = ModelRouter([StubModelBackend("primary", latency=0.01)], min_samples=20, store=store)
+for _ in range(20):
+    warm.invoke("system", "Analyze AAPL")
+
+primary = StubModelBackend("primary")
+cold = ModelRouter([primary], default_hedge_delay=45, min_hedge_delay=0.5, min_samples=20, store=store)
+assert cold.hedge_delay(primary) == 45
+cold.invoke("system", "Analyze AAPL")
+stats = cold.stats()["primary"]
+assert stats["count"] == 21, stats
+assert stats["hedge_delay"] == 0.5, stats
+print(f"   ✓ Cold start hedges after {stats['hedge_delay']}s from {stats['count']} pooled samples")
+
+# Test 7: prefetched results outlive PREFETCH_SECONDS while a router call holds them
+print("\n7. Testing prefetched results held during a router call...")
+prefetch.PREFETCH_SECONDS = 0
+prefetch.store_prefetched("news", "aapl", {"articles": []})
+with prefetch.holding_prefetched("AAPL"):
+    assert prefetch.take_prefetched("news", "AAPL") == {"articles": []}
+    assert prefetch.take_prefetched("news", "AAPL") == {"articles": []}
+assert prefetch.take_prefetched("news", "AAPL") is None
+print("   ✓ Peeked by every hedge while held, expired after")
+
+print("\n" + "=" * 50)
+print("Model Router Test Complete! ✓")
+print("=" * 50)
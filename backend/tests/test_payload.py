@@ -0,0 +1,54 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.payload import MIN_STRING_LENGTH, TokenReport, compact_payload, estimate_tokens
+
+print("=" * 50)
+print("Testing payload compaction (offline)")
+print("=" * 50)
+
+# Test 1: noise keys and empty values dropped, big numbers abbreviated
+print("\n1. Testing compaction...")
+result = compact_payload(
+    {"ticker": "AAPL", "revenue": 394328000000, "notes": "", "tags": [], "margin": 0.253147},
+    drop_keys=("ticker",),
+)
+assert result == {"revenue": "394.3B", "margin": 0.253}, result
+print(f"   ✓ {result}")
+
+# Test 2: lists trimmed before strings to fit the budget
+print("\n2. Testing truncation to budget...")
+news = {
+    "headlines": [
+        {"title": f"Headline number {i} about the company and its quarterly results", "source": "Reuters"}
+        for i in range(20)
+    ]
+}
+result = compact_payload(news, token_budget=100)
+assert estimate_tokens(result) <= 100, estimate_tokens(result)
+assert 0 < len(result["headlines"]) < 20
+print(f"   ✓ Kept {len(result['headlines'])} of 20 headlines in {estimate_tokens(result)} tokens")
+
+# Test 3: an unreachable budget returns the smallest payload instead of looping
+print("\n3. Testing unreachable budget...")
+result = compact_payload({"a": "x" * 200}, token_budget=5)
+assert len(result["a"]) == MIN_STRING_LENGTH + 1, len(result["a"])
+result = compact_payload(news, token_budget=5)
+assert len(result["headlines"]) == 1
+assert len(result["headlines"][0]["title"]) <= MIN_STRING_LENGTH + 1
+print(f"   ✓ Stopped at {estimate_tokens(result)} tokens")
+
+# Test 4: token report totals
+print("\n4. Testing token report...")
+report = TokenReport()
+report.record("prompt", 10)
+report.record("finances", 150, 100)
+summary = report.summary()
+assert summary["tokens_sent"] == 110 and summary["tokens_saved"] == 50, summary
+print(f"   ✓ {summary['tokens_sent']} sent, {summary['tokens_saved']} saved")
+
+print("\n" + "=" * 50)
+print("Payload Test Complete! ✓")
+print("=" * 50)
@@ -0,0 +1,103 @@
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools import peer_stats
+from tools.peer_stats import QUANTILE_STEPS, quantile_sketch, sector_percentiles, sketch_percentile
+
+print("=" * 50)
+print("Testing peer stats (offline)")
+print("=" * 50)
+
+# Test 1: sketch spans min to max with interpolated quantiles
+print("\n1. Testing quantile_sketch...")
+sketch = quantile_sketch([50, 10, 30, 20, 40])
+assert len(sketch) == QUANTILE_STEPS + 1, len(sketch)
+assert sketch[0] == 10 and sketch[-1] == 50, sketch
+assert sketch[QUANTILE_STEPS // 2] == 30, sketch
+assert sketch == sorted(sketch)
+assert quantile_sketch([7]) == [7] * (QUANTILE_STEPS + 1)
+print(f"   ✓ {sketch[0]} .. {sketch[QUANTILE_STEPS // 2]} .. {sketch[-1]}")
+
+# Test 2: percentiles clamp at the ends and interpolate inside
+print("\n2. Testing sketch_percentile...")
+sketch = quantile_sketch(range(101))
+assert sketch_percentile(sketch, -5) == 0.0
+assert sketch_percentile(sketch, 0) == 0.0
+assert sketch_percentile(sketch, 100) == 100.0
+assert sketch_percentile(sketch, 500) == 100.0
+assert sketch_percentile(sketch, 50) == 50.0
+assert sketch_percentile(sketch, 37.5) == 37.5
+# flat stretches of the sketch (many equal peers) don't divide by zero
+flat = quantile_sketch([1, 2, 2, 2, 2, 2, 3])
+assert 0 < sketch_percentile(flat, 2) < 100, sketch_percentile(flat, 2)
+print("   ✓ Clamped, interpolated and safe on repeated values")
+
+
+def sector(count, counts=None):
+    stats = {
+        "count": count,
+        "profit_margin": quantile_sketch([0.05, 0.10, 0.15, 0.20, 0.25]),
+        "market_cap": quantile_sketch([1e9, 2e9, 3e9, 4e9, 5e9]),
+        "month_return_pct": quantile_sketch([-10, -5, 0, 5, 10]),
+    }
+    if counts is not None:
+        stats["counts"] = counts
+    return stats
+
+
+def fresh():
+    return datetime.now(timezone.utc).isoformat()
+
+
+metrics = {"profit_margin": 0.15, "market_cap": 5e9, "month_return_pct": 0, "revenue_per_employee": 1e6}
+
+# Test 3: every sketched metric ranked against a fresh, well-populated sector
+print("\n3. Testing sector_percentiles...")
+peer_stats.PEER_STATS = {"built_at": fresh(), "sectors": {"Technology": sector(8)}}
+result = sector_percentiles("Technology", metrics)
+assert result == {"profit_margin": 50.0, "market_cap": 100.0, "month_return_pct": 50.0}, result
+print(f"   ✓ {result}")
+
+# Test 4: unknown, missing and thin sectors fall back to absolute thresholds
+print("\n4. Testing sector fallbacks...")
+peer_stats.PEER_STATS = {
+    "built_at": fresh(),
+    "sectors": {"Technology": sector(8), "Utilities": sector(peer_stats.MIN_PEERS - 1)},
+}
+assert sector_percentiles("Basic Materials", metrics) == {}
+assert sector_percentiles(None, metrics) == {}
+assert sector_percentiles("Utilities", metrics) == {}
+print("   ✓ Unknown, missing and thin sectors return nothing")
+
+# Test 5: a metric with fewer than MIN_PEERS values is skipped even in a big sector
+print("\n5. Testing per-metric MIN_PEERS...")
+peer_stats.PEER_STATS = {
+    "built_at": fresh(),
+    "sectors": {
+        "Technology": sector(
+            8, counts={"profit_margin": 8, "market_cap": peer_stats.MIN_PEERS - 1, "month_return_pct": 8}
+        )
+    },
+}
+result = sector_percentiles("Technology", metrics)
+assert "market_cap" not in result and "profit_margin" in result, result
+print(f"   ✓ {sorted(result)}")
+
+# Test 6: an old or undated index stops ranking 1-month returns, keeps the rest
+print("\n6. Testing stale month returns...")
+stale = datetime.now(timezone.utc) - timedelta(hours=peer_stats.PEER_RETURN_MAX_AGE_HOURS + 1)
+for built_at in (stale.isoformat(), None):
+    peer_stats.PEER_STATS = {"sectors": {"Technology": sector(8)}}
+    if built_at:
+        peer_stats.PEER_STATS["built_at"] = built_at
+    result = sector_percentiles("Technology", metrics)
+    assert "month_return_pct" not in result, result
+    assert set(result) == {"profit_margin", "market_cap"}, result
+print("   ✓ Stale and undated indexes drop month_return_pct")
+
+print("\n" + "=" * 50)
+print("Peer Stats Test Complete! ✓")
+print("=" * 50)
@@ -0,0 +1,77 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambdas"))
+
+import symbol_index
+from symbol_index import SymbolIndex, load_listings, parse_listing, resolve_symbol
+
+print("=" * 50)
+print("Testing symbol index (offline)")
+print("=" * 50)
+
+CURATED = """{
+  "AAPL": {"default": "Apple Inc.", "aliases": ["Apple", "iPhone"]},
+  "AMZN": {"default": "Amazon.com, Inc.", "aliases": ["Amazon", "AWS"]},
+  "MSFT": {"default": "Microsoft Corporation", "aliases": ["Microsoft"]}
+}"""
+
+EXCHANGE = """Symbol|Security Name|Market Category|Test Issue|Financial Status|Round Lot Size|ETF|NextShares
+AAPL|Apple Inc. - Common Stock|Q|N|N|100|N|N
+PLTR|Palantir Technologies Inc. - Class A Common Stock|Q|N|N|100|N|N
+ZAZZT|Tick Pilot Test Stock|G|Y|N|100|N|N
+File Creation Time: 1019202600:00|||||||"""
+
+# Test 1: exchange file parsing
+print("\n1. Testing exchange listing parse...")
+listing = parse_listing(EXCHANGE)
+assert listing["PLTR"] == ("Palantir Technologies Inc.", []), listing["PLTR"]
+assert "ZAZZT" not in listing
+print(f"   ✓ {len(listing)} symbols, test issues skipped")
+
+# Test 2: lookup by ticker, name and alias
+print("\n2. Testing lookup...")
+index = SymbolIndex({**listing, **parse_listing(CURATED)})
+assert index.lookup("aapl") == "AAPL"
+assert index.lookup("Apple") == "AAPL"
+assert index.lookup("iphone") == "AAPL"
+assert index.lookup("Netflix") is None
+print("   ✓ Ticker, name and alias lookups")
+
+# Test 3: prefix and fuzzy search
+print("\n3. Testing search...")
+assert [r["ticker"] for r in index.search("ap")][0] == "AAPL"
+assert "AMZN" in [r["ticker"] for r in index.search("Amazn")]
+assert index.search("") == []
+print(f"   ✓ {index.search('Amazn')}")
+
+# Test 4: resolve_symbol in format and strict mode
+print("\n4. Testing resolve_symbol...")
+symbol_index._index = index
+symbol_index.SYMBOL_VALIDATION = "format"
+assert resolve_symbol("Apple", "Apple")[:2] == ("AAPL", "Apple")
+assert resolve_symbol("RKLB", "RKLB") == ("RKLB", "RKLB", [])
+ticker, _, suggestions = resolve_symbol("Amazn", "Amazn")
+assert ticker is None and suggestions[0]["ticker"] == "AMZN"
+symbol_index.SYMBOL_VALIDATION = "strict"
+assert resolve_symbol("RKLB", "RKLB")[0] is None
+assert resolve_symbol("Palantir Technologies", None)[0] == "PLTR"
+print("   ✓ Listed names resolve, typos get suggestions, strict rejects unlisted")
+
+# Test 5: a downloaded listing merges under the curated aliases
+print("\n5. Testing refresh merge...")
+import tempfile
+
+with tempfile.TemporaryDirectory() as tmp:
+    curated_path = os.path.join(tmp, "companies.json")
+    with open(curated_path, "w", encoding="utf-8") as f:
+        f.write(CURATED)
+    merged = load_listings([os.path.join(tmp, "nasdaqlisted.txt"), curated_path], listing)
+index = SymbolIndex(merged)
+assert index.lookup("Apple") == "AAPL" and index.names["AAPL"] == "Apple Inc."
+assert index.lookup("PLTR") == "PLTR"
+print("   ✓ Curated aliases survive a refreshed exchange listing")
+
+print("\n" + "=" * 50)
+print("Symbol Index Test Complete! ✓")
+print("=" * 50)
@@ -0,0 +1,70 @@
+"""
+Offline bulk rebuild of the sector peer index used for relative health scoring.
+
+    python tools/build_peer_stats.py                 # every ticker in the symbol listing
+    python tools/build_peer_stats.py AAPL MSFT NVDA  # just these
+"""
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tools.financial_analyzer import fetch_yahoo_data, month_return_pct
+from tools.peer_stats import PEER_METRICS, PEER_STATS_PATH, peer_metrics, quantile_sketch
+
+# the frontend's company directory (the same one the symbol index loads)
+SYMBOL_LISTING_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "frontend",
+    "src",
+    "data",
+    "companies.json",
+)
+
+
+def build_peer_stats(tickers):
+    """Fetch every ticker once and reduce each sector to quantile sketches"""
+    samples = {}  # sector -> metric -> [values]
+
+    for i, ticker in enumerate(tickers, 1):
+        try:
+            info, hist = fetch_yahoo_data(ticker)
+            sector = info.get("sector")
+            if not sector or hist.empty:
+                continue
+            metrics = peer_metrics(info, month_return_pct(hist))
+        except Exception as e:
+            print(f"   ✗ {ticker}: {e}")
+            continue
+
+        sector_samples = samples.setdefault(sector, {"count": 0})
+        sector_samples["count"] += 1
+        for name, value in metrics.items():
+            sector_samples.setdefault(name, []).append(value)
+        print(f"   ✓ [{i}/{len(tickers)}] {ticker} ({sector})")
+
+    sectors = {}
+    for sector, sector_samples in samples.items():
+        sectors[sector] = {"count": sector_samples["count"], "counts": {}}
+        for name in PEER_METRICS:
+            if sector_samples.get(name):
+                sectors[sector][name] = quantile_sketch(sector_samples[name])
+                sectors[sector]["counts"][name] = len(sector_samples[name])
+
+    return {"built_at": datetime.now(timezone.utc).isoformat(), "sectors": sectors}
+
+
+if __name__ == "__main__":
+    tickers = sys.argv[1:]
+    if not tickers:
+        with open(SYMBOL_LISTING_PATH, encoding="utf-8") as f:
+            tickers = sorted(json.load(f))
+
+    print(f"Building peer stats from {len(tickers)} tickers...")
+    stats = build_peer_stats(tickers)
+
+    os.makedirs(os.path.dirname(PEER_STATS_PATH), exist_ok=True)
+    with open(PEER_STATS_PATH, "w", encoding="utf-8") as f:
+        json.dump(stats, f, indent=2)
+    print(f"✓ Wrote {len(stats['sectors'])} sectors to {PEER_STATS_PATH}")
@@ -0,0 +1,228 @@
+import boto3
+import os
+import threading
+import time
+
+# consecutive failures before a provider's circuit opens
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "3"))
+
+# how long an open circuit fails fast before letting one trial call through
+CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "60"))
+
+# optional DynamoDB table (partition key "provider") to share breaker state across instances
+CIRCUIT_BREAKER_TABLE_NAME = os.getenv("CIRCUIT_BREAKER_TABLE_NAME")
+SHARED_SYNC_SECONDS = 5
+
+# last-known-good results kept per provider
+LAST_KNOWN_GOOD_SIZE = 256
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose circuit is open"""
+
+
+# SDK exceptions without an OSError base that still mean the provider is unreachable
+TRANSPORT_ERROR_NAMES = ("Timeout", "Connection", "DNS", "Curl")
+
+# NewsAPIException carries NewsAPI's error code instead of an HTTP status
+NEWSAPI_SERVER_ERROR_CODES = ("unexpectedError",)
+
+
+def is_provider_failure(error):
+    """Transport errors, timeouts and 5xx responses count against a provider -
+    per-request errors (unknown symbol, bad parameters, 4xx) mean it answered fine"""
+    if type(error).__name__ == "NewsAPIException":
+        return error.get_code() in NEWSAPI_SERVER_ERROR_CODES
+
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None) or getattr(error, "code", None)
+    if isinstance(status, int):
+        return status >= 500
+
+    # requests/urllib/socket transport errors and timeouts are all OSErrors
+    if isinstance(error, OSError):
+        return True
+    return any(word in type(error).__name__ for word in TRANSPORT_ERROR_NAMES)
+
+
+class DynamoDBBreakerStore:
+    """Shares open/closed state between Lambda instances through a small DynamoDB table"""
+
+    def __init__(self, table_name):
+        self.table = boto3.resource("dynamodb").Table(table_name)
+
+    def load(self, name):
+        item = self.table.get_item(Key={"provider": name}).get("Item")
+        if not item:
+            return None
+        return {
+            "state": item["state"],
+            "opened_at": float(item.get("opened_at", 0)),
+            "updated_at": float(item.get("updated_at", 0)),
+        }
+
+    def save(self, name, state, opened_at):
+        self.table.put_item(
+            Item={
+                "provider": name,
+                "state": state,
+                "opened_at": str(opened_at),
+                "updated_at": str(time.time()),
+            }
+        )
+
+
+class CircuitBreaker:
+    """Closed -> open after repeated failures -> half-open trial -> closed again"""
+
+    def __init__(
+        self,
+        name,
+        failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+        reset_seconds=CIRCUIT_RESET_SECONDS,
+        store=None,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.store = store
+
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.trip_count = 0
+        self.rejected_count = 0
+        self._last_sync = 0.0
+        self._last_known_good = {}
+
+    def call(self, fn, *args, **kwargs):
+        """Call fn through the breaker - raises CircuitOpenError without calling it when open"""
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} circuit open")
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            if is_provider_failure(e):
+                self.record_failure()
+            else:
+                # the provider answered, just not with what this request wanted
+                self.record_success()
+            raise
+        self.record_success()
+        return result
+
+    def allow(self):
+        self._sync_from_store()
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.time() - self.opened_at >= self.reset_seconds:
+                self.state = HALF_OPEN
+                self.trial_in_flight = False
+            if self.state == HALF_OPEN and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+            self.rejected_count += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            was_closed = self.state == CLOSED
+            self.state = CLOSED
+            self.failures = 0
+            self.trial_in_flight = False
+        if not was_closed:
+            print(f"[circuit] {self.name} closed")
+            self._publish(CLOSED, 0.0)
+
+    def record_failure(self):
+        with self._lock:
+            # calls already in flight when the circuit opened - it's open, don't re-trip it
+            if self.state == OPEN:
+                return
+            self.failures += 1
+            if self.state != HALF_OPEN and self.failures < self.failure_threshold:
+                return
+            self.state = OPEN
+            self.opened_at = time.time()
+            self.trial_in_flight = False
+            self.trip_count += 1
+            opened_at = self.opened_at
+        print(f"[circuit] {self.name} OPEN after {self.failures} failures")
+        self._publish(OPEN, opened_at)
+
+    def remember(self, key, value):
+        """Store a good result to serve while the circuit is open"""
+        with self._lock:
+            self._last_known_good.pop(key, None)
+            self._last_known_good[key] = value
+            if len(self._last_known_good) > LAST_KNOWN_GOOD_SIZE:
+                del self._last_known_good[next(iter(self._last_known_good))]
+
+    def last_known_good(self, key):
+        with self._lock:
+            return self._last_known_good.get(key)
+
+    def status(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "trip_count": self.trip_count,
+                "rejected_count": self.rejected_count,
+                "opened_at": self.opened_at or None,
+            }
+
+    def _sync_from_store(self):
+        """Adopt an open circuit tripped by another instance (rate limited)"""
+        if not self.store:
+            return
+        now = time.time()
+        if now - self._last_sync < SHARED_SYNC_SECONDS:
+            return
+        self._last_sync = now
+        try:
+            shared = self.store.load(self.name)
+        except Exception as e:
+            print(f"[circuit] {self.name} shared state unavailable: {e}")
+            return
+        if not shared:
+            return
+        with self._lock:
+            if shared["state"] == OPEN and self.state == CLOSED and shared["opened_at"] > self.opened_at:
+                self.state = OPEN
+                self.opened_at = shared["opened_at"]
+            elif shared["state"] == CLOSED and self.state == OPEN and shared["updated_at"] > self.opened_at:
+                self.state = CLOSED
+                self.failures = 0
+
+    def _publish(self, state, opened_at):
+        if not self.store:
+            return
+        try:
+            self.store.save(self.name, state, opened_at)
+        except Exception as e:
+            print(f"[circuit] {self.name} failed to share state: {e}")
+
+
+_store = DynamoDBBreakerStore(CIRCUIT_BREAKER_TABLE_NAME) if CIRCUIT_BREAKER_TABLE_NAME else None
+
+BREAKERS = {
+    name: CircuitBreaker(name, store=_store)
+    for name in ("yahoo", "fred", "alphavantage", "newsapi")
+}
+
+
+def get_breaker(name):
+    return BREAKERS[name]
+
+
+def breaker_status():
+    """State and trip counts for every provider, for monitoring"""
+    return {name: breaker.status() for name, breaker in BREAKERS.items()}
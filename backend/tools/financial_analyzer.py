@@ -1,29 +1,49 @@
 from strands.tools import tool
 import yfinance as yf
-from fredapi import Fred
+import requests
 import os
 from dotenv import load_dotenv
+from tools.circuit_breaker import CircuitOpenError, get_breaker
+from tools.payload import compact_tool_result
+from tools.peer_stats import peer_metrics, sector_percentiles
+from tools.prefetch import take_prefetched
 
 load_dotenv()
 FRED_API_KEY = os.getenv("FRED_API_KEY")
 
 API_TIMEOUT = 10
 
+# used when FRED is down and we have nothing better
+DEFAULT_ECONOMIC_CONTEXT = {
+    "error": "FRED API unavailable",
+    "unemployment_rate": 4.0,
+    "avg_hourly_wage": 36.06,
+    "avg_annual_salary": 75000
+}
+
+YAHOO_BREAKER = get_breaker("yahoo")
+FRED_BREAKER = get_breaker("fred")
+
 @tool
 def analyze_company_finances(ticker_symbol):
     """
     Analyzes a company's financial health using Yahoo Finance data.
     """
+    result = take_prefetched("finances", ticker_symbol) or get_company_finances(
+        ticker_symbol
+    )
+    # ticker is already in the prompt, no need to echo it back
+    return compact_tool_result("finances", result, drop_keys=("ticker",))
+
+
+def get_company_finances(ticker_symbol):
+    """Fetch and score Yahoo Finance data - full uncompacted result"""
     errors = []
     status = "complete"
 
     # try to fetch Yahoo Finance data
     try: 
-        company = yf.Ticker(ticker_symbol)
-
-        # get stock history from last 3 months
-        info = company.info
-        hist = company.history(period="3mo", timeout=API_TIMEOUT)
+        info, hist = YAHOO_BREAKER.call(fetch_yahoo_data, ticker_symbol)
 
         # if somehow we can't find history, just provide empty
         if hist.empty:
@@ -34,6 +54,22 @@ def analyze_company_finances(ticker_symbol):
                 "ticker": ticker_symbol
             }
     
+    # Yahoo is down - don't wait on it, serve the last good result if we have one
+    except CircuitOpenError as e:
+        last_good = YAHOO_BREAKER.last_known_good(ticker_symbol.upper())
+        if last_good:
+            return {
+                **last_good,
+                "status": "partial",
+                "errors": [f"Yahoo Finance unavailable ({e}), showing last known data"],
+            }
+        errors.append(f"Yahoo Finance error: {str(e)}")
+        return {
+            "status": "failed",
+            "errors": errors,
+            "ticker": ticker_symbol
+        }
+
         # if somehow we get an error, say same thing
     except Exception as e:
         errors.append(f"Yahoo Finance error: {str(e)}")
@@ -53,10 +89,7 @@ def analyze_company_finances(ticker_symbol):
     # if everything's good, let's try to calculate metrics
     try: 
         current_price = hist["Close"].iloc[-1]
-        month_ago_price = (
-            hist["Close"].iloc[-22] if len(hist) > 22 else hist["Close"].iloc[0]
-        )
-        price_change_pct = ((current_price - month_ago_price) / month_ago_price) * 100
+        price_change_pct = month_return_pct(hist)
 
         # Determine trend
         if price_change_pct > 5:
@@ -66,14 +99,21 @@ def analyze_company_finances(ticker_symbol):
         else:
             trend = "stable"
 
+        # Where the company sits among its sector peers (empty if sector not indexed)
+        peer_percentiles = sector_percentiles(
+            info.get("sector"), peer_metrics(info, price_change_pct)
+        )
+
         # Calculate simple health score (0-100)
-        health_score = calculate_health_score(info, price_change_pct, econ_context)
+        health_score = calculate_health_score(
+            info, price_change_pct, econ_context, peer_percentiles
+        )
 
         # Identify signals
         signals = identify_signals(info, price_change_pct)
 
     # Return structured data
-        return {
+        result = {
             "status": status,
             "errors": errors if errors else None,
             "company_name": info.get("longName", "Unknown"),
@@ -94,8 +134,14 @@ def analyze_company_finances(ticker_symbol):
                 "trend": trend,
             },
             "economic_context": econ_context,
-            "analysis": {"financial_health_score": health_score, "signals": signals},
+            "analysis": {
+                "financial_health_score": health_score,
+                "signals": signals,
+                "peer_percentiles": peer_percentiles or None,
+            },
         }
+        YAHOO_BREAKER.remember(ticker_symbol.upper(), result)
+        return result
 
     except Exception as e:
         errors.append(f"Calculation error: {str(e)}")
@@ -106,28 +152,65 @@ def analyze_company_finances(ticker_symbol):
         }
 
 
-def calculate_health_score(info, price_change_pct, econ_context):
-    """Calculate a simple 0-100 health score with economic context."""
+def fetch_yahoo_data(ticker_symbol):
+    """Company info plus 3 months of price history from Yahoo Finance"""
+    company = yf.Ticker(ticker_symbol)
+
+    # get stock history from last 3 months
+    info = company.info
+    hist = company.history(period="3mo", timeout=API_TIMEOUT)
+    return info, hist
+
+
+def month_return_pct(hist):
+    """Percent change in close price over roughly the last month (22 trading days)"""
+    current_price = hist["Close"].iloc[-1]
+    month_ago_price = (
+        hist["Close"].iloc[-22] if len(hist) > 22 else hist["Close"].iloc[0]
+    )
+    return ((current_price - month_ago_price) / month_ago_price) * 100
+
+
+def calculate_health_score(info, price_change_pct, econ_context, peer_percentiles=None):
+    """Calculate a simple 0-100 health score with economic context.
+    Metrics with a sector peer percentile are scored against peers instead of absolute thresholds."""
     score = 50 
+    peers = peer_percentiles or {}
 
     # Positive factors
-    if info.get("profitMargins", 0) > 0.1:  # >10% profit margin
+    if "profit_margin" in peers:
+        if peers["profit_margin"] >= 60:  # better margins than most of the sector
+            score += 20
+    elif info.get("profitMargins", 0) > 0.1:  # >10% profit margin
         score += 20
-    if price_change_pct > 0:  # Stock trending up
+    if "month_return_pct" in peers:
+        if peers["month_return_pct"] >= 50:  # outperforming sector this month
+            score += 15
+    elif price_change_pct > 0:  # Stock trending up
         score += 15
-    if info.get("marketCap", 0) > 100_000_000_000:  # >100B market cap
+    if "market_cap" in peers:
+        if peers["market_cap"] >= 75:  # one of the sector's larger players
+            score += 10
+    elif info.get("marketCap", 0) > 100_000_000_000:  # >100B market cap
         score += 10
 
     # Negative factors
     if info.get("profitMargins", 0) < 0:  # Losing money
         score -= 30
-    if price_change_pct < -10:  # Stock down >10%
+    if "month_return_pct" in peers:
+        if peers["month_return_pct"] < 10:  # bottom tenth of the sector this month
+            score -= 20
+    elif price_change_pct < -10:  # Stock down >10%
         score -= 20
 
     employees = info.get('fullTimeEmployees', 1)
     revenue = info.get('totalRevenue', 0)
 
-    if employees > 0 and revenue > 0:
+    if "revenue_per_employee" in peers:
+        # Productive vs. sector peers, likely pays well
+        if peers["revenue_per_employee"] >= 60:
+            score += 5
+    elif employees > 0 and revenue > 0:
         revenue_per_employee = revenue / employees
         avg_salary = econ_context.get('avg_annual_salary', 75000)
         
@@ -145,25 +228,53 @@ def calculate_health_score(info, price_change_pct, econ_context):
 def get_economic_context():
     """Fetch current economic indicators from FRED"""
     try:
-        fred = Fred(api_key=FRED_API_KEY)
-        
-        unemployment = fred.get_series('UNRATE', limit=1).iloc[-1]
-        avg_hourly_wage = fred.get_series('CES0500000003', limit=1).iloc[-1]
-        
-        return {
+        unemployment, avg_hourly_wage = FRED_BREAKER.call(fetch_fred_indicators)
+
+        econ_context = {
             "unemployment_rate": round(unemployment, 1),
             "avg_hourly_wage": round(avg_hourly_wage, 2),
             "avg_annual_salary": round(avg_hourly_wage * 2080, 0)
         }
+        FRED_BREAKER.remember("latest", econ_context)
+        return econ_context
+    except CircuitOpenError:
+        # indicators move monthly, the last good reading is as good as fresh
+        last_good = FRED_BREAKER.last_known_good("latest")
+        if last_good:
+            return last_good
+        print("[WARNING] FRED circuit open, using defaults")
+        return dict(DEFAULT_ECONOMIC_CONTEXT)
     except Exception as e:
         # Fallback if FRED fails
         print(f"[WARNING] FRED API failed: {str(e)}, using defaults")
-        return {
-            "error": "FRED API unavailable",
-            "unemployment_rate": 4.0,
-            "avg_hourly_wage": 36.06,
-            "avg_annual_salary": 75000
-        }
+        return dict(DEFAULT_ECONOMIC_CONTEXT)
+
+
+FRED_OBSERVATIONS_URL = "https://api.stlouisfed.org/fred/series/observations"
+
+
+def fetch_fred_indicators():
+    """Latest unemployment rate and average hourly wage from FRED"""
+    return fetch_fred_latest("UNRATE"), fetch_fred_latest("CES0500000003")
+
+
+def fetch_fred_latest(series_id):
+    """Most recent value of a FRED series - raises on HTTP errors/timeouts so the breaker sees them
+    (fredapi has no timeout and turns every HTTP error into ValueError)"""
+    response = requests.get(FRED_OBSERVATIONS_URL, params={
+        "series_id": series_id,
+        "api_key": FRED_API_KEY,
+        "file_type": "json",
+        "sort_order": "desc",
+        "limit": 5,
+    }, timeout=API_TIMEOUT)
+    response.raise_for_status()
+
+    # newest first; "." marks a missing observation
+    for observation in response.json()["observations"]:
+        if observation["value"] != ".":
+            return float(observation["value"])
+    raise ValueError(f"No recent FRED observations for {series_id}")
 
 
 def identify_signals(info, price_change_pct):
@@ -0,0 +1,69 @@
+import hashlib
+import json
+import math
+import os
+
+# relative change (0.02 = 2%) below which numbers count as "the same" for narrative reuse
+NARRATIVE_CHANGE_TOLERANCE = float(os.getenv("NARRATIVE_CHANGE_TOLERANCE", "0.02"))
+
+
+def fingerprint_tool_outputs(finances, news, tolerance=None):
+    """Hash the material content of both tool outputs - equal hashes mean the narrative is still valid"""
+    tolerance = NARRATIVE_CHANGE_TOLERANCE if tolerance is None else tolerance
+    normalized = {
+        "finances": normalize_finances(finances, tolerance),
+        "news": normalize_news(news, tolerance),
+    }
+    encoded = json.dumps(normalized, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def normalize_finances(finances, tolerance):
+    """Reduce a get_company_finances result to coarse buckets"""
+    health = finances.get("financial_health") or {}
+    performance = finances.get("stock_performance") or {}
+    analysis = finances.get("analysis") or {}
+
+    return {
+        "status": finances.get("status"),
+        "revenue": bucket(health.get("revenue"), tolerance),
+        "market_cap": bucket(health.get("market_cap"), tolerance),
+        "employees": bucket(health.get("employees"), tolerance),
+        "profit_margin": step(health.get("profit_margin"), tolerance),
+        "price": bucket(performance.get("current_price"), tolerance),
+        "price_change_pct": step(performance.get("price_change_pct"), tolerance * 100),
+        "trend": performance.get("trend"),
+        "health_score": analysis.get("financial_health_score"),
+        "signals": sorted(analysis.get("signals") or []),
+    }
+
+
+def normalize_news(news, tolerance):
+    """Reduce a get_company_news result to sentiment buckets and the set of headline URLs"""
+    sentiment = news.get("market_sentiment") or {}
+    articles = news.get("news_analysis") or {}
+    headlines = articles.get("recent_headlines") or []
+
+    return {
+        "status": news.get("status"),
+        "sentiment": sentiment.get("overall_sentiment"),
+        "sentiment_score": step(sentiment.get("sentiment_score"), tolerance * 10),
+        "headline_urls": sorted(
+            {h.get("url") or h.get("title") for h in headlines} - {None}
+        ),
+        "job_signals": articles.get("job_signals"),
+    }
+
+
+def bucket(value, tolerance):
+    """Log-scale bucket so values within ~tolerance of each other usually land together"""
+    if not isinstance(value, (int, float)) or value <= 0 or tolerance <= 0:
+        return value
+    return math.floor(math.log(value) / math.log(1 + tolerance))
+
+
+def step(value, size):
+    """Linear bucket for values that can be zero or negative (margins, % changes)"""
+    if not isinstance(value, (int, float)) or size <= 0:
+        return value
+    return math.floor(value / size)
@@ -4,6 +4,9 @@ import requests
 import os
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
+from tools.circuit_breaker import CircuitOpenError, get_breaker
+from tools.payload import compact_tool_result
+from tools.prefetch import take_prefetched
 
 load_dotenv()
 NEWS_API_KEY = os.getenv("NEWS_API_KEY")
@@ -12,12 +15,24 @@ ALPHA_URL = "https://www.alphavantage.co/query"
 
 API_TIMEOUT = 10
 
+ALPHA_BREAKER = get_breaker("alphavantage")
+NEWSAPI_BREAKER = get_breaker("newsapi")
+
 
 @tool
 def analyze_company_news(company_name, ticker_symbol):
     """
     Analyzes recent news and market sentiment about a company using multiple sources.
     """
+    result = take_prefetched("news", ticker_symbol) or get_company_news(
+        company_name, ticker_symbol
+    )
+    # company/ticker are already in the prompt, urls only matter for fingerprinting
+    return compact_tool_result("news", result, drop_keys=("company", "ticker", "url"))
+
+
+def get_company_news(company_name, ticker_symbol):
+    """Fetch AlphaVantage sentiment and NewsAPI headlines - full uncompacted result"""
     errors = []
     alpha_sentiment = None
     news_articles = None
@@ -68,14 +83,7 @@ def get_alphavantage_sentiment(ticker_symbol):
     """Get quantitative sentiment from AlphaVantage"""
     try:
         # Get news sentiment
-        response = requests.get(ALPHA_URL, params={
-            'function': 'NEWS_SENTIMENT',
-            'tickers': ticker_symbol,
-            'apikey': ALPHAVANTAGE_API_KEY,
-            'limit': 20
-        }, timeout=API_TIMEOUT)
-        
-        news_data = response.json().get('feed', [])
+        news_data = ALPHA_BREAKER.call(fetch_alphavantage_feed, ticker_symbol)
         
         if not news_data:
             return {"error": "No sentiment data available"}
@@ -106,17 +114,33 @@ def get_alphavantage_sentiment(ticker_symbol):
                 if theme and theme not in themes:
                     themes.append(theme)
         
-        return {
+        sentiment = {
             "overall_sentiment": label,
             "sentiment_score": round(avg_sentiment, 3),
             "article_count": len(news_data),
             "key_themes": themes[:5]
         }
+        ALPHA_BREAKER.remember(ticker_symbol.upper(), sentiment)
+        return sentiment
         
+    except CircuitOpenError as e:
+        return ALPHA_BREAKER.last_known_good(ticker_symbol.upper()) or {"error": str(e)}
     except Exception as e:
         return {"error": f"AlphaVantage API failed: {str(e)}"}
 
 
+def fetch_alphavantage_feed(ticker_symbol):
+    """Raw NEWS_SENTIMENT feed - raises on HTTP errors so the breaker sees them"""
+    response = requests.get(ALPHA_URL, params={
+        'function': 'NEWS_SENTIMENT',
+        'tickers': ticker_symbol,
+        'apikey': ALPHAVANTAGE_API_KEY,
+        'limit': 20
+    }, timeout=API_TIMEOUT)
+    response.raise_for_status()
+    return response.json().get('feed', [])
+
+
 def get_newsapi_articles(company_name):
     """Get articles and detect layoff/hiring signals"""
     try:
@@ -124,7 +148,8 @@ def get_newsapi_articles(company_name):
         
         from_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
         
-        articles = newsapi.get_everything(
+        articles = NEWSAPI_BREAKER.call(
+            newsapi.get_everything,
             q=company_name,
             from_param=from_date,
             language='en',
@@ -141,18 +166,23 @@ def get_newsapi_articles(company_name):
                 "title": article['title'],
                 "description": article.get('description', ''),
                 "source": article['source']['name'],
-                "published": article['publishedAt']
+                "published": article['publishedAt'],
+                "url": article.get('url')
             })
         
         # Analyze for job seeker signals
         signals = analyze_job_signals(headlines)
         
-        return {
+        news = {
             "articles_found": len(headlines),
             "recent_headlines": headlines[:5],
             "job_signals": signals
         }
+        NEWSAPI_BREAKER.remember(company_name.lower(), news)
+        return news
         
+    except CircuitOpenError as e:
+        return NEWSAPI_BREAKER.last_known_good(company_name.lower()) or {"error": str(e)}
     except Exception as e:
         return {"error": f"NewsAPI failed: {str(e)}"}
 
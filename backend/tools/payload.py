@@ -0,0 +1,165 @@
+import contextvars
+import json
+import math
+import os
+import threading
+
+# rough Claude tokenizer estimate - good enough for budgeting, not billing
+CHARS_PER_TOKEN = 4
+
+# max tokens a single tool result may add to the agent context
+TOOL_TOKEN_BUDGET = int(os.getenv("TOOL_TOKEN_BUDGET", "600"))
+
+# strings shorter than this are never truncated
+MIN_STRING_LENGTH = 40
+
+
+def estimate_tokens(data):
+    """Estimate how many tokens a string or JSON-serializable value costs"""
+    if not isinstance(data, str):
+        data = json.dumps(data, separators=(",", ":"), default=str)
+    return math.ceil(len(data) / CHARS_PER_TOKEN)
+
+
+def abbreviate_number(value):
+    """Shorten big numbers (394328000000 -> '394.3B') and round long floats"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return value
+
+    magnitude = abs(value)
+    for limit, suffix in ((1e12, "T"), (1e9, "B"), (1e6, "M")):
+        if magnitude >= limit:
+            return f"{value / limit:.1f}{suffix}"
+
+    if isinstance(value, float):
+        return round(value, 3)
+    return value
+
+
+def compact_payload(payload, token_budget=None, drop_keys=()):
+    """Drop empty values and noise keys, abbreviate numbers and truncate to the token budget"""
+    budget = TOOL_TOKEN_BUDGET if token_budget is None else token_budget
+    compact = _compact(payload, set(drop_keys))
+
+    # shrink the biggest thing left until we fit or nothing is left to shrink -
+    # the result can still be over an unreachable budget
+    while estimate_tokens(compact) > budget and _truncate_once(compact):
+        pass
+
+    return compact
+
+
+def _compact(value, drop_keys):
+    if isinstance(value, dict):
+        result = {}
+        for key, item in value.items():
+            if key in drop_keys:
+                continue
+            item = _compact(item, drop_keys)
+            if item is None or item == "" or item == [] or item == {}:
+                continue
+            result[key] = item
+        return result
+    if isinstance(value, (list, tuple)):
+        return [_compact(item, drop_keys) for item in value]
+    return abbreviate_number(value)
+
+
+def _truncate_once(payload):
+    """Trim the largest list by one item, or else halve the longest string. Returns False if nothing left to trim."""
+    longest_list = None
+    longest_string = None  # (container, key, length)
+
+    stack = [payload]
+    while stack:
+        node = stack.pop()
+        items = node.items() if isinstance(node, dict) else enumerate(node)
+        for key, item in items:
+            if isinstance(item, (dict, list)):
+                if isinstance(item, list) and len(item) > 1:
+                    if longest_list is None or len(item) > len(longest_list):
+                        longest_list = item
+                stack.append(item)
+            # a string cut to MIN_STRING_LENGTH + "…" is MIN_STRING_LENGTH + 1 long - leave it be
+            elif isinstance(item, str) and len(item) > MIN_STRING_LENGTH + 1:
+                if longest_string is None or len(item) > longest_string[2]:
+                    longest_string = (node, key, len(item))
+
+    if longest_list is not None:
+        longest_list.pop()
+        return True
+    if longest_string is not None:
+        node, key, length = longest_string
+        node[key] = node[key][: max(MIN_STRING_LENGTH, length // 2)].rstrip() + "…"
+        return True
+    return False
+
+
+class TokenReport:
+    """Per-analysis record of how many tokens each stage adds to the agent context"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages = {}
+
+    def reset(self):
+        with self._lock:
+            self.stages = {}
+
+    def record(self, stage, raw_tokens, sent_tokens=None):
+        with self._lock:
+            self.stages[stage] = {
+                "raw_tokens": raw_tokens,
+                "sent_tokens": raw_tokens if sent_tokens is None else sent_tokens,
+            }
+
+    def record_usage(self, agent_result):
+        """Record Bedrock-reported token usage from a Strands AgentResult, if present"""
+        metrics = getattr(agent_result, "metrics", None)
+        usage = getattr(metrics, "accumulated_usage", None) if metrics else None
+        if not usage:
+            return
+        with self._lock:
+            self.stages["bedrock"] = {
+                "input_tokens": usage.get("inputTokens", 0),
+                "output_tokens": usage.get("outputTokens", 0),
+            }
+
+    def summary(self):
+        with self._lock:
+            stages = {name: dict(counts) for name, counts in self.stages.items()}
+        return {
+            "stages": stages,
+            "tokens_sent": sum(s.get("sent_tokens", 0) for s in stages.values()),
+            "tokens_saved": sum(
+                s.get("raw_tokens", 0) - s.get("sent_tokens", 0) for s in stages.values()
+            ),
+        }
+
+
+class RequestTokenReport:
+    """The current request's TokenReport - concurrent analyses (threaded server) each get their own.
+    reset() starts one in this context; work handed to other threads must run in a copy of it
+    (contextvars.copy_context) to record into the same report."""
+
+    _current = contextvars.ContextVar("token_report", default=None)
+
+    def __init__(self):
+        # records made outside any request (scripts, tests) land here
+        self._unscoped = TokenReport()
+
+    def reset(self):
+        self._current.set(TokenReport())
+
+    def __getattr__(self, name):
+        return getattr(self._current.get() or self._unscoped, name)
+
+
+token_report = RequestTokenReport()
+
+
+def compact_tool_result(stage, result, drop_keys=()):
+    """Compact a tool result for the agent and record its token cost"""
+    compact = compact_payload(result, drop_keys=drop_keys)
+    token_report.record(stage, estimate_tokens(result), estimate_tokens(compact))
+    return compact
@@ -0,0 +1,107 @@
+import bisect
+import json
+import os
+from datetime import datetime, timezone
+
+# per-sector quantile sketches, rebuilt offline by tools/build_peer_stats.py
+PEER_STATS_PATH = os.getenv(
+    "PEER_STATS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "peer_stats.json"),
+)
+
+# every 5th percentile: 0, 5, ..., 100
+QUANTILE_STEPS = 20
+
+# sectors (or single metrics) with fewer companies than this fall back to absolute thresholds
+MIN_PEERS = 5
+
+# 1-month returns are a snapshot of the month the index was built - older than this, today's
+# return is ranked against the wrong month, so that metric falls back to absolute thresholds
+PEER_RETURN_MAX_AGE_HOURS = float(os.getenv("PEER_RETURN_MAX_AGE_HOURS", "48"))
+TIME_SENSITIVE_METRICS = ("month_return_pct",)
+
+PEER_METRICS = ("profit_margin", "revenue_per_employee", "market_cap", "month_return_pct")
+
+
+def peer_metrics(info, price_change_pct):
+    """The metrics we compare against sector peers, from a yfinance info dict"""
+    employees = info.get("fullTimeEmployees") or 0
+    revenue = info.get("totalRevenue") or 0
+
+    metrics = {
+        "profit_margin": info.get("profitMargins"),
+        "revenue_per_employee": revenue / employees if employees > 0 and revenue > 0 else None,
+        "market_cap": info.get("marketCap"),
+        "month_return_pct": price_change_pct,
+    }
+    return {k: float(v) for k, v in metrics.items() if v is not None}
+
+
+def quantile_sketch(values):
+    """Summarize a list of values as QUANTILE_STEPS + 1 evenly spaced quantiles"""
+    values = sorted(values)
+    last = len(values) - 1
+    sketch = []
+    for step in range(QUANTILE_STEPS + 1):
+        position = last * step / QUANTILE_STEPS
+        lower = int(position)
+        upper = min(lower + 1, last)
+        fraction = position - lower
+        sketch.append(values[lower] + (values[upper] - values[lower]) * fraction)
+    return sketch
+
+
+def sketch_percentile(sketch, value):
+    """Where value falls in a quantile sketch, 0-100 (binary search + interpolation)"""
+    if value <= sketch[0]:
+        return 0.0
+    if value >= sketch[-1]:
+        return 100.0
+
+    i = bisect.bisect_right(sketch, value)
+    low, high = sketch[i - 1], sketch[i]
+    fraction = (value - low) / (high - low) if high > low else 0.0
+    return round((i - 1 + fraction) * 100 / QUANTILE_STEPS, 1)
+
+
+def load_peer_stats(path=PEER_STATS_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            stats = json.load(f)
+        print(f"✓ Loaded peer stats for {len(stats.get('sectors', {}))} sectors")
+        return stats
+    except FileNotFoundError:
+        return {"sectors": {}}
+    except Exception as e:
+        print(f"[WARNING] Peer stats unavailable: {str(e)}")
+        return {"sectors": {}}
+
+
+PEER_STATS = load_peer_stats()
+
+
+def sector_percentiles(sector, metrics):
+    """Peer percentile for each metric we have a sketch for - empty if the sector isn't indexed"""
+    sector_stats = PEER_STATS["sectors"].get(sector) if sector else None
+    if not sector_stats or sector_stats.get("count", 0) < MIN_PEERS:
+        return {}
+
+    # per-metric peer counts (older index files only have the sector count)
+    counts = sector_stats.get("counts", {})
+    stale = stats_age_hours() > PEER_RETURN_MAX_AGE_HOURS
+
+    return {
+        name: sketch_percentile(sector_stats[name], value)
+        for name, value in metrics.items()
+        if sector_stats.get(name)
+        and counts.get(name, sector_stats["count"]) >= MIN_PEERS
+        and not (stale and name in TIME_SENSITIVE_METRICS)
+    }
+
+
+def stats_age_hours():
+    """Hours since the peer index was built - infinite if it doesn't say"""
+    built_at = PEER_STATS.get("built_at")
+    if not built_at:
+        return float("inf")
+    return (datetime.now(timezone.utc) - datetime.fromisoformat(built_at)).total_seconds() / 3600
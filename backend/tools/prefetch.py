@@ -0,0 +1,51 @@
+from contextlib import contextmanager
+import threading
+import time
+
+# how long a prefetched tool result can stand in for a live tool call once no
+# model call for its ticker is in flight
+PREFETCH_SECONDS = 120
+
+_prefetched = {}  # (tool, ticker) -> (fetched_at, result)
+_holds = {}  # ticker -> model calls in flight that may still read its results
+_lock = threading.Lock()
+
+
+def store_prefetched(tool, ticker_symbol, result):
+    """Keep a tool result fetched ahead of the agent so its tool call can reuse it"""
+    with _lock:
+        _prefetched[(tool, ticker_symbol.upper())] = (time.monotonic(), result)
+
+
+@contextmanager
+def holding_prefetched(ticker_symbol):
+    """Keep this ticker's prefetched results from expiring while a router call is in flight -
+    a hedge launched late makes the same tool calls long after they were stored"""
+    ticker = ticker_symbol.upper()
+    with _lock:
+        _holds[ticker] = _holds.get(ticker, 0) + 1
+    try:
+        yield
+    finally:
+        with _lock:
+            _holds[ticker] -= 1
+            if not _holds[ticker]:
+                del _holds[ticker]
+                # a losing hedge may still be finishing - give it PREFETCH_SECONDS from now
+                now = time.monotonic()
+                for key, (_, result) in list(_prefetched.items()):
+                    if key[1] == ticker:
+                        _prefetched[key] = (now, result)
+
+
+def take_prefetched(tool, ticker_symbol):
+    """Return a fresh prefetched result for this tool/ticker, or None.
+    Peeked, not popped - a hedged second model makes the same tool calls."""
+    key = (tool, ticker_symbol.upper())
+    with _lock:
+        entry = _prefetched.get(key)
+        if entry and key[1] not in _holds and time.monotonic() - entry[0] >= PREFETCH_SECONDS:
+            del _prefetched[key]
+            entry = None
+
+    return entry[1] if entry else None
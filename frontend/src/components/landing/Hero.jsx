@@ -26,7 +26,10 @@ const Hero = () => {
     setIsLoading(true);
     try {
       const result = await apiService.analyzeCompany(selectedTicker);
-      navigate(`/report?ticker=${result.ticker}`);
+      // ts lets /report skip an older copy cached on another Lambda instance
+      navigate(
+        `/report?ticker=${result.ticker}&ts=${encodeURIComponent(result.timestamp)}`
+      );
       setCompanyInput("");
       setSelectedTicker(null);
     } catch (error) {
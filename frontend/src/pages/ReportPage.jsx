@@ -13,6 +13,7 @@ const ReportPage = () => {
   const navigate = useNavigate();
   const [searchParams] = useSearchParams();
   const ticker = searchParams.get("ticker");
+  const ts = searchParams.get("ts");
 
   const [reportData, setReportData] = useState(null);
   const [loading, setLoading] = useState(true);
@@ -25,12 +26,12 @@ const ReportPage = () => {
     }
 
     fetchReport();
-  }, [ticker, navigate]);
+  }, [ticker, ts, navigate]);
 
   const fetchReport = async () => {
     try {
       setLoading(true);
-      const data = await apiService.getReport(ticker);
+      const data = await apiService.getReport(ticker, ts);
 
       // Parse the full_analysis to extract structured data
       const parsedData = parseAnalysis(data);
@@ -70,9 +70,10 @@ class ApiService {
     }
   }
 
-  async getReport(ticker) {
+  async getReport(ticker, ts = null) {
     try {
-      const response = await fetch(`${this.baseUrl}/report?ticker=${ticker}`);
+      const query = ts ? `&ts=${encodeURIComponent(ts)}` : "";
+      const response = await fetch(`${this.baseUrl}/report?ticker=${ticker}${query}`);
 
       if (!response.ok) {
         throw new Error(`HTTP error! status: ${response.status}`);